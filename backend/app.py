@@ -1,52 +1,272 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
-from tensorflow.keras.applications.xception import preprocess_input
-from PIL import Image
-import numpy as np
-import io
 from datetime import datetime
-import boto3
+from typing import List, Optional, Union
+import asyncio
+import json
+import logging
+import threading
+import time
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import NoCredentialsError
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    AWS_ACCESS_KEY,
+    AWS_SECRET_KEY,
+    S3_BUCKET_NAME,
+    S3_BUCKET_NAME_POSTS,
+    S3_REGION_NAME,
+    DYNAMODB_TABLE_VALID_DATA,
+    DYNAMODB_TABLE_FAKE_DATA,
+    DYNAMODB_TABLE_POSTS,
+    DYNAMODB_TABLE_VERDICTS,
+    DYNAMODB_TABLE_USER_STATS,
+    DYNAMODB_TABLE_REGISTRATION_KEYS,
+    POSTS_FEED_INDEX,
+    REGISTRATIONS_USERNAME_INDEX,
+    FEED_PARTITION,
+    FEED_DEFAULT_PAGE_SIZE,
+    FEED_MAX_PAGE_SIZE,
+    FEED_RESPONSE_CACHE_SIZE,
+    RESPONSE_COMPRESS_MIN_BYTES,
+    RESPONSE_GZIP_LEVEL,
+    RESPONSE_BROTLI_QUALITY,
+    PROFILE_CACHE_SIZE,
+    PROFILE_CACHE_TTL_SECONDS,
+    PROFILE_CACHE_REDIS_URL,
+    INFERENCE_BACKEND,
+    INFERENCE_MODEL_PATHS,
+    INFERENCE_THREADS,
+    MAX_UPLOAD_BYTES,
+    UPLOAD_MULTIPART_THRESHOLD,
+    UPLOAD_MULTIPART_CHUNKSIZE,
+    UPLOAD_MAX_CONCURRENCY,
+    DERIVATIVES_ENABLED,
+    POST_IMAGE_VARIANTS,
+    PROFILE_IMAGE_VARIANTS,
+    DERIVATIVE_FORMAT,
+    DERIVATIVE_QUALITY,
+    VERDICT_CACHE_SIZE,
+    VERDICT_CACHE_STORE,
+    VERDICT_CACHE_SQLITE_PATH,
+    VERDICT_CACHE_PERCEPTUAL,
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+    BATCH_MAX_QUEUE_DEPTH,
+    ROI_ENABLED,
+    ROI_WORK_SIZE,
+    ROI_DETECT_SIZE,
+    ROI_MIN_FACE_PX,
+    ROI_MAX_REGIONS,
+    ROI_MARGIN,
+    ROI_INCLUDE_FULL_FRAME,
+    ROI_AGGREGATE,
+    IO_POOL_SIZE,
+    IO_MAX_PENDING,
+    INFERENCE_EXECUTOR,
+    INFERENCE_WORKERS,
+    INFERENCE_MAX_PENDING,
+    RETRY_AFTER_SECONDS,
+    MODEL_RETRY_AFTER_SECONDS,
+    PREDICT_BATCH_MAX_IN_FLIGHT,
+    PREDICT_BATCH_MAX_FILES,
+    VERIFY_ASYNC,
+    VERIFICATION_QUEUE_PATH,
+    VERIFICATION_CONSUMERS,
+    VERIFICATION_POLL_SECONDS,
+    VERIFICATION_LEASE_SECONDS,
+    VERIFICATION_MAX_ATTEMPTS,
+    VERIFICATION_RETENTION_SECONDS,
+    LIVE_FEED_MAX_SUBSCRIBERS,
+    LIVE_FEED_BUFFER,
+    LIVE_FEED_REPLAY,
+    LIVE_FEED_HEARTBEAT_SECONDS,
+    LIVE_FEED_RETRY_MS,
+    AWS_S3_MAX_POOL_CONNECTIONS,
+    AWS_DYNAMODB_MAX_POOL_CONNECTIONS,
+    AWS_RETRY_MODE,
+    AWS_MAX_ATTEMPTS,
+    AWS_CONNECT_TIMEOUT,
+    AWS_READ_TIMEOUT,
+    AWS_ENDPOINT_URLS,
+    AWS_ASYNC_CLIENTS,
+    METRICS_ENABLED,
+    METRICS_TRACE_REQUESTS,
+    METRICS_TRACE_MIN_MS,
+)
+from aws_clients import AsyncDynamoDB, CallMetrics, make_client, make_client_config, make_resource, make_session
+from batching import BatchPredictor
+from bulk_predict import InvalidArchive, already_open, detach_upload, read_zip_entry, score_stream, zip_image_entries
+from executors import ExecutorSaturated, ServiceUnavailable, make_inference_executor, make_io_executor
+from metrics import Metrics, format_trace, start_trace
+from feed import InvalidCursor, batch_get_users, join_post, query_feed_page
+from live_feed import FeedBroadcaster, sse_frame
+from profile_cache import ProfileCache, RedisProfileStore
+from preprocessing import INPUT_SHAPE, fill_model_input, prepare_upload
+from regions import FaceDetector, RegionExtractor, aggregate, prepare_regions
+from registrations import DuplicateAccount, claim_account, release_account
+from http_cache import EncodedResponseCache, choose_encoding, encoded_etag, etag_matches, http_date, make_etag
+from storage import (
+    check_image,
+    create_derivatives,
+    detect_content_type,
+    download_original,
+    file_size,
+    key_from_url,
+    make_transfer_config,
+    pick_variant,
+    public_url,
+    upload_original,
+)
+from user_stats import get_stats, record_post
+from model_manager import ModelManager
+from inference_backends import backend_class, backend_version, load_backend
+from verification import PENDING, UNVERIFIABLE, VerificationQueue, apply_verdict, retry_or_give_up
+from verdict_cache import DynamoDBVerdictStore, SQLiteVerdictStore, VerdictCache
 
 # uvicorn app:app --reload --host 0.0.0.0 --port 8000
 
+logger = logging.getLogger(__name__)
 
-# AWS Configuration
-AWS_ACCESS_KEY = ""
-AWS_SECRET_KEY = ""
-S3_BUCKET_NAME = "news1-bucket"
-S3_BUCKET_NAME_POSTS = "feedsbuck" 
-S3_REGION_NAME = "us-east-1"
 
-DYNAMODB_TABLE_VALID_DATA = "registrations"
-DYNAMODB_TABLE_FAKE_DATA = "fake_registrations"
-DYNAMODB_TABLE_POSTS = "posts"  
+# Stage/route latency histograms and component gauges, served on /metrics
+metrics = Metrics(METRICS_ENABLED)
 
 # Initialize AWS Clients
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=S3_REGION_NAME,
+aws_metrics = CallMetrics()
+aws_session = make_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_REGION_NAME)
+
+
+def aws_config(max_pool_connections):
+    return make_client_config(
+        max_pool_connections, AWS_RETRY_MODE, AWS_MAX_ATTEMPTS, AWS_CONNECT_TIMEOUT, AWS_READ_TIMEOUT
+    )
+
+
+s3_client = make_client(
+    aws_session, "s3", aws_config(AWS_S3_MAX_POOL_CONNECTIONS), aws_metrics, AWS_ENDPOINT_URLS["s3"]
 )
 
-dynamodb = boto3.resource(
-    "dynamodb",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=S3_REGION_NAME,
+dynamodb = make_resource(
+    aws_session, "dynamodb", aws_config(AWS_DYNAMODB_MAX_POOL_CONNECTIONS), aws_metrics, AWS_ENDPOINT_URLS["dynamodb"]
 )
 
+# Async routes query DynamoDB on the event loop when aiobotocore is available
+async_dynamodb = None
+if AWS_ASYNC_CLIENTS:
+    try:
+        async_dynamodb = AsyncDynamoDB(
+            aws_config(AWS_DYNAMODB_MAX_POOL_CONNECTIONS), aws_metrics,
+            AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_REGION_NAME, AWS_ENDPOINT_URLS["dynamodb"],
+        )
+    except ImportError:
+        logger.warning("AWS_ASYNC_CLIENTS is set but aiobotocore is not installed; using the I/O executor")
+
 registration_table = dynamodb.Table(DYNAMODB_TABLE_VALID_DATA)
 fake_registrations_table = dynamodb.Table(DYNAMODB_TABLE_FAKE_DATA)
 posts_table = dynamodb.Table(DYNAMODB_TABLE_POSTS)
+user_stats_table = dynamodb.Table(DYNAMODB_TABLE_USER_STATS)
+registration_keys_table = dynamodb.Table(DYNAMODB_TABLE_REGISTRATION_KEYS)
+
+
+if VERDICT_CACHE_STORE == "sqlite":
+    verdict_store = SQLiteVerdictStore(VERDICT_CACHE_SQLITE_PATH)
+elif VERDICT_CACHE_STORE == "dynamodb":
+    verdict_store = DynamoDBVerdictStore(dynamodb.Table(DYNAMODB_TABLE_VERDICTS))
+else:
+    verdict_store = None
+verdict_cache = VerdictCache(max_entries=VERDICT_CACHE_SIZE, store=verdict_store)
+
+# With ROI_ENABLED, faces are cropped and scored alongside the full frame (regions.py)
+region_extractor = RegionExtractor(
+    FaceDetector(min_size=ROI_MIN_FACE_PX),
+    work_size=ROI_WORK_SIZE,
+    detect_size=ROI_DETECT_SIZE,
+    max_regions=min(ROI_MAX_REGIONS, BATCH_MAX_SIZE - 1),  # all of an image's crops fit in one forward pass
+    margin=ROI_MARGIN,
+    include_full_frame=ROI_INCLUDE_FULL_FRAME,
+) if ROI_ENABLED else None
+
+# Coalesces concurrent predictions into batched forward passes
+batch_predictor = BatchPredictor(
+    lambda batch: model_manager.predict(batch),
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    input_shape=INPUT_SHAPE,
+    max_queue_depth=BATCH_MAX_QUEUE_DEPTH,
+    retry_after=RETRY_AFTER_SECONDS,
+    fill_fn=fill_model_input,
+    on_batch=metrics.observe_batch,
+)
+
+# Pretrained model for fake image detection, loaded and warmed up in the background at startup
+model_manager = ModelManager(
+    INFERENCE_MODEL_PATHS[INFERENCE_BACKEND],
+    lambda path: load_backend(INFERENCE_BACKEND, path, num_threads=INFERENCE_THREADS),
+    lambda backend, batch: backend.predict(batch),
+    warmup_batch_sizes=batch_predictor.batch_sizes,
+    input_shape=INPUT_SHAPE,
+    preload_modules=backend_class(INFERENCE_BACKEND).modules,
+    on_version=verdict_cache.set_model_version,
+    retry_after=MODEL_RETRY_AFTER_SECONDS,
+    version_fn=lambda path: backend_version(INFERENCE_BACKEND, path),
+)
 
-# Load Pretrained Model for Fake Image Detection
-model = load_model("fine_tuned_xception_best_model.keras")
+profile_cache = ProfileCache(
+    lambda user_ids: batch_get_users(dynamodb, DYNAMODB_TABLE_VALID_DATA, user_ids),
+    max_entries=PROFILE_CACHE_SIZE,
+    ttl_seconds=PROFILE_CACHE_TTL_SECONDS,
+    shared_store=RedisProfileStore(PROFILE_CACHE_REDIS_URL) if PROFILE_CACHE_REDIS_URL else None,
+)
+
+feed_responses = EncodedResponseCache(
+    max_entries=FEED_RESPONSE_CACHE_SIZE,
+    min_bytes=RESPONSE_COMPRESS_MIN_BYTES,
+    gzip_level=RESPONSE_GZIP_LEVEL,
+    brotli_quality=RESPONSE_BROTLI_QUALITY,
+)
+
+transfer_config = make_transfer_config(
+    UPLOAD_MULTIPART_THRESHOLD, UPLOAD_MULTIPART_CHUNKSIZE, UPLOAD_MAX_CONCURRENCY
+)
+
+io_executor = make_io_executor(IO_POOL_SIZE, IO_MAX_PENDING, RETRY_AFTER_SECONDS)
+inference_executor = make_inference_executor(
+    INFERENCE_EXECUTOR, INFERENCE_WORKERS, INFERENCE_MAX_PENDING, RETRY_AFTER_SECONDS
+)
+
+# Posts accepted as pending are verified from this queue by in-app consumers and/or verification_worker.py
+verification_queue = (
+    VerificationQueue(VERIFICATION_QUEUE_PATH, VERIFICATION_LEASE_SECONDS, VERIFICATION_MAX_ATTEMPTS)
+    if VERIFY_ASYNC else None
+)
+# Enqueues run here rather than on the bounded I/O pool: once a pending post is stored its
+# job must be recorded, and a saturated pool would leave the post pending with no job
+verification_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="verification-queue") if VERIFY_ASYNC else None
+verification_tasks = []
+
+# New posts and verdicts are pushed to GET /posts/stream clients of this worker
+live_feed = FeedBroadcaster(
+    buffer_size=LIVE_FEED_BUFFER,
+    replay_size=LIVE_FEED_REPLAY,
+    max_subscribers=LIVE_FEED_MAX_SUBSCRIBERS,
+    retry_after=RETRY_AFTER_SECONDS,
+)
+live_feed_tasks = set()
+
+metrics.register_stats("model", model_manager.status)
+metrics.register_stats("batching", batch_predictor.stats)
+metrics.register_stats("verdict_cache", verdict_cache.stats)
+metrics.register_stats("profile_cache", profile_cache.stats)
+metrics.register_stats("feed_responses", feed_responses.stats)
+metrics.register_stats("inference_executor", inference_executor.stats)
+metrics.register_stats("io_executor", io_executor.stats)
+metrics.register_stats("verification_queue", lambda: verification_queue.stats() if verification_queue is not None else None)
+metrics.register_stats("aws", lambda: {"operation": aws_metrics.stats()})
+metrics.register_stats("live_feed", live_feed.stats)
 
 # FastAPI App Initialization
 app = FastAPI(title="Deepfake News Verification API")
@@ -68,17 +288,88 @@ class FakeRegistration(BaseModel):
 class Post(BaseModel):
     user_id: str
     content: str
-    status: bool
+    status: Union[bool, str]  # True = real, False = fake, PENDING while queued, UNVERIFIABLE if verification gave up
     image_url: str
+    feed: str = FEED_PARTITION  # partition key of the feed GSI
+
+
+def check_upload_size(upload):
+    """Rejects uploads above MAX_UPLOAD_BYTES before any decoding or S3 traffic."""
+    if file_size(upload.file) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
 
 
-def upload_to_s3(file, bucket_name, file_name):
-    """Uploads a file to S3 and returns the public URL."""
+def store_original(upload, bucket_name, file_name):
+    """Streams an UploadFile to S3 exactly as received and returns the public URL.
+
+    The content type is sniffed from the image header, falling back to what the
+    client sent.
+    """
+    content_type = detect_content_type(upload.file, fallback=upload.content_type or "application/octet-stream")
     try:
-        s3_client.upload_fileobj(file, bucket_name, file_name)
-        return f"https://{bucket_name}.s3.{S3_REGION_NAME}.amazonaws.com/{file_name}"
+        with metrics.span("s3.upload"):
+            upload_original(s3_client, upload.file, bucket_name, file_name, content_type, transfer_config)
     except NoCredentialsError:
         raise HTTPException(status_code=500, detail="AWS credentials not available")
+    return public_url(bucket_name, file_name, S3_REGION_NAME)
+
+
+# Derivative kinds: (bucket, table, item attribute holding the variant keys, variants, square crop)
+DERIVATIVE_KINDS = {
+    "post": (S3_BUCKET_NAME_POSTS, posts_table, "image_variants", POST_IMAGE_VARIANTS, False),
+    "profile": (S3_BUCKET_NAME, registration_table, "profile_image_variants", PROFILE_IMAGE_VARIANTS, True),
+}
+variants_in_flight = set()
+variants_failed = set()  # not retried on later feed reads in this process
+variants_lock = threading.Lock()
+
+
+def generate_variants(kind, item_id, key):
+    """Renders every derivative of one post/profile image and records their keys on the item."""
+    bucket_name, table, attribute, variants, square = DERIVATIVE_KINDS[kind]
+    keys = create_derivatives(s3_client, bucket_name, key, variants, DERIVATIVE_FORMAT, DERIVATIVE_QUALITY, square)
+    table.update_item(
+        Key={"id": item_id},
+        UpdateExpression="SET #variants = :keys",
+        ConditionExpression="attribute_exists(id)",
+        ExpressionAttributeNames={"#variants": attribute},
+        ExpressionAttributeValues={":keys": keys},
+    )
+    if kind == "profile":
+        profile_cache.invalidate(item_id)
+
+
+def schedule_variants(kind, item_id, key):
+    """Queues derivative generation on the I/O pool; duplicates and saturation are skipped."""
+    if not DERIVATIVES_ENABLED or not key:
+        return
+    with variants_lock:
+        if (kind, item_id) in variants_in_flight or (kind, item_id) in variants_failed:
+            return
+        variants_in_flight.add((kind, item_id))
+
+    def done(future):
+        failed = not future.cancelled() and future.exception() is not None
+        with variants_lock:
+            variants_in_flight.discard((kind, item_id))
+            if failed:
+                variants_failed.add((kind, item_id))
+        if failed:
+            logger.warning("Derivatives for %s %s failed: %s", kind, item_id, future.exception())
+
+    try:
+        io_executor.submit(generate_variants, kind, item_id, key).add_done_callback(done)
+    except ExecutorSaturated:
+        with variants_lock:
+            variants_in_flight.discard((kind, item_id))
+
+
+def variant_url(kind, item, width):
+    """URL of the smallest recorded derivative at least `width` px wide, or None to use the original."""
+    bucket_name, _, attribute, _, _ = DERIVATIVE_KINDS[kind]
+    variants = item.get(attribute) or {}
+    label = pick_variant(variants, width)
+    return public_url(bucket_name, variants[label], S3_REGION_NAME) if label else None
 
 
 def store_in_dynamodb(table, data):
@@ -97,7 +388,8 @@ def store_in_dynamodb(table, data):
             data["timestamp"] = datetime.utcnow().isoformat()
 
         # Insert data into DynamoDB
-        table.put_item(Item=data)
+        with metrics.span("dynamodb.put_item"):
+            table.put_item(Item=data)
         return data
 
     except Exception as e:
@@ -105,41 +397,377 @@ def store_in_dynamodb(table, data):
 
 
 
-
-def preprocess_image(image):
-    """Preprocesses an image for XceptionNet."""
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-    image = image.resize((150, 150))
-    image = img_to_array(image)
-    image = np.expand_dims(image, axis=0)
-    return preprocess_input(image)
+async def score_upload(file):
+    """Returns the raw model score for an uploaded image file without blocking the event loop."""
+    score, _ = await score_upload_regions(file)
+    return score
+
+
+async def score_upload_regions(file):
+    """Returns (score, regions) for an uploaded image file without blocking the event loop.
+
+    Decoding, cache lookup and resizing run on the inference executor; on a cache
+    miss the pixels are normalized into the batch buffer and the forward pass is
+    awaited on the shared batch predictor. Cache hits are served even while the
+    model is still loading; misses raise ModelNotReady until it is ready.
+
+    With ROI_ENABLED the full frame and each detected face are scored together
+    and `score` aggregates them (ROI_AGGREGATE); `regions` lists each crop's
+    {box, score}, box being None for the full frame. It is None without ROI
+    scoring or when the verdict came from the cache.
+    """
+    # Process-pool workers cannot share the in-memory cache, so look up in this process instead
+    in_process = INFERENCE_EXECUTOR == "thread"
+    file.seek(0)
+    # Threads decode straight from the spooled upload; process workers need the bytes pickled over
+    source = file if in_process else await io_executor.run(file.read)
+    cache = verdict_cache if in_process else None
+    boxes = None
+    with metrics.span("preprocess"):
+        if region_extractor is None:
+            keys, score, pixels = await inference_executor.run(prepare_upload, source, cache, VERDICT_CACHE_PERCEPTUAL)
+        else:
+            keys, score, boxes, pixels = await inference_executor.run(
+                prepare_regions, source, region_extractor, cache, VERDICT_CACHE_PERCEPTUAL, ROI_AGGREGATE
+            )
+    if score is None and not in_process:
+        with metrics.span("verdict_cache.lookup"):
+            score = await io_executor.run(verdict_cache.get, keys)
+    regions = None
+    if score is None:
+        model_manager.check_ready()
+        # Queueing for a batch plus the forward pass itself
+        with metrics.span("inference"):
+            if boxes is None:
+                score = await asyncio.wrap_future(batch_predictor.submit(pixels))
+            else:
+                futures = batch_predictor.submit_many(pixels)
+                scores = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+                score = aggregate(scores, ROI_AGGREGATE)
+                regions = [{"box": box, "score": region_score} for box, region_score in zip(boxes, scores)]
+        try:
+            io_executor.submit(verdict_cache.put, keys, score)
+        except ExecutorSaturated:
+            pass  # caching is best-effort; never fail a request over it
+    return score, regions
 
 
-def predict_image(image):
-    """Predicts whether an image is fake or real."""
+async def predict_upload(file):
+    """Predicts fake/real for an uploaded image file without blocking the event loop."""
     try:
-        processed_image = preprocess_image(image)
-        prediction = model.predict(processed_image)
-        return "Fake" if prediction[0][0] > 0.5 else "Real"
+        score = await score_upload(file)
+        return "Fake" if score > 0.5 else "Real"
+    except ServiceUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction Error: {str(e)}")
 
 
+async def verify_job(job):
+    """Scores a queued post's stored original and records the verdict; failures are retried with backoff."""
+    try:
+        with metrics.span("s3.download"):
+            image = await io_executor.run(download_original, s3_client, job["bucket"], job["s3_key"])
+        try:
+            while True:
+                try:
+                    score = await score_upload(image)
+                    break
+                except ServiceUnavailable as e:
+                    # Pools are busy serving requests; back off without spending one of the job's attempts
+                    await asyncio.sleep(e.retry_after)
+        finally:
+            image.close()
+        with metrics.span("verification.apply_verdict"):
+            status = bool(score <= 0.5)
+            applied = await io_executor.run(apply_verdict, posts_table, user_stats_table, job, status)
+        if applied:
+            live_feed.publish("verdict", {"id": job["post_id"], "status": status})
+        await io_executor.run(verification_queue.complete, job["id"])
+    except asyncio.CancelledError:
+        raise  # shutting down; the job's lease expires and another worker picks it up
+    except Exception as e:
+        logger.warning("Verification of post %s failed (attempt %s): %s", job["post_id"], job["attempts"], e)
+        try:
+            gave_up = await io_executor.run(
+                retry_or_give_up, verification_queue, posts_table, user_stats_table, job, str(e)
+            )
+        except Exception as retry_error:
+            # Pools are saturated or the post could not be updated: the job's lease expires and it is handed out again
+            logger.warning("Could not requeue verification of post %s: %s", job["post_id"], retry_error)
+            return
+        if gave_up:
+            live_feed.publish("verdict", {"id": job["post_id"], "status": UNVERIFIABLE})
+
+
+async def publish_post(post_item):
+    """Pushes a new post to live feed clients, joined with its author's profile like GET /posts."""
+    try:
+        users = await io_executor.run(profile_cache.get_many, [post_item["user_id"]])
+    except Exception as e:
+        logger.warning("Live feed update for post %s skipped: %s", post_item["id"], e)
+        return
+    user_info = users.get(post_item["user_id"])
+    if user_info:
+        live_feed.publish("post", join_post(post_item, user_info))
+
+
+def schedule_publish(post_item):
+    task = asyncio.create_task(publish_post(post_item))
+    live_feed_tasks.add(task)
+    task.add_done_callback(live_feed_tasks.discard)
+
+
+async def verification_consumer():
+    """Claims and verifies queued posts one at a time until the app shuts down."""
+    last_purge = 0.0
+    while not model_manager.ready:
+        await asyncio.sleep(VERIFICATION_POLL_SECONDS)
+    while True:
+        try:
+            jobs = await io_executor.run(verification_queue.claim, 1)
+        except ServiceUnavailable as e:
+            await asyncio.sleep(e.retry_after)
+            continue
+        if not jobs:
+            if time.monotonic() - last_purge > 60:
+                last_purge = time.monotonic()
+                await io_executor.run(verification_queue.purge, VERIFICATION_RETENTION_SECONDS)
+            await asyncio.sleep(VERIFICATION_POLL_SECONDS)
+            continue
+        await verify_job(jobs[0])
+
+
+@app.middleware("http")
+async def instrument_requests(request, call_next):
+    """Times every request by route template and, with METRICS_TRACE_REQUESTS, logs its stage breakdown."""
+    spans = start_trace()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.observe_request(request.method, path, status, elapsed)
+        if METRICS_TRACE_REQUESTS and elapsed * 1000.0 >= METRICS_TRACE_MIN_MS:
+            logger.info("%s %s %s %.1fms %s", request.method, path, status, elapsed * 1000.0, format_trace(spans))
+
+
+@app.exception_handler(ServiceUnavailable)
+async def service_unavailable_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Service unavailable: {exc}"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.on_event("startup")
+def start_inference():
+    model_manager.start()
+    batch_predictor.start()
+
+
+@app.on_event("startup")
+async def start_async_clients():
+    if async_dynamodb is not None:
+        await async_dynamodb.start()
+
+
+@app.on_event("shutdown")
+async def stop_async_clients():
+    if async_dynamodb is not None:
+        await async_dynamodb.close()
+
+
+@app.on_event("startup")
+async def start_verification_consumers():
+    if verification_queue is not None:
+        for _ in range(VERIFICATION_CONSUMERS):
+            verification_tasks.append(asyncio.create_task(verification_consumer()))
+
+
+@app.on_event("shutdown")
+async def stop_verification_consumers():
+    for task in verification_tasks:
+        task.cancel()
+    await asyncio.gather(*verification_tasks, return_exceptions=True)
+
+
+@app.on_event("shutdown")
+def stop_executors():
+    batch_predictor.stop()
+    inference_executor.shutdown(wait=False)
+    io_executor.shutdown(wait=True)
+    if verdict_store is not None:
+        verdict_store.close()
+    if verification_writer is not None:
+        verification_writer.shutdown(wait=True)
+    if verification_queue is not None:
+        verification_queue.close()
+
+
 @app.get("/")
 def root():
     return {"message": "Welcome to the Deepfake News Verification API"}
 
 
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests (the model may still be loading)."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once the model is loaded and warmed up, 503 with its lifecycle state before that."""
+    status = model_manager.status()
+    if not status["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content=status,
+            headers={"Retry-After": str(MODEL_RETRY_AFTER_SECONDS)},
+        )
+    return status
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus exposition of request/stage latency histograms and component gauges."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Reports size, hit ratio and staleness window of the verdict and author profile caches."""
+    return {
+        "verdict_cache": verdict_cache.stats(),
+        "profile_cache": profile_cache.stats(),
+        "feed_responses": feed_responses.stats(),
+    }
+
+
+@app.get("/inference/stats")
+def get_inference_stats():
+    """Reports model lifecycle timings, batching counters, executor queue depths, cache hit rates, job counts,
+    per-operation AWS call latency and live feed subscribers."""
+    return {
+        "model": model_manager.status(),
+        "batching": batch_predictor.stats(),
+        "verdict_cache": verdict_cache.stats(),
+        "inference_executor": inference_executor.stats(),
+        "io_executor": io_executor.stats(),
+        "verification_queue": verification_queue.stats() if verification_queue is not None else None,
+        "aws": aws_metrics.stats(),
+        "live_feed": live_feed.stats(),
+    }
+
+
+@app.post("/predict")
+async def predict(image: UploadFile = File(...)):
+    """Scores one image; `score` is the raw model output (above 0.5 means fake).
+
+    With ROI_ENABLED, `regions` carries the per-face scores behind it.
+    """
+    check_upload_size(image)
+    try:
+        score, regions = await score_upload_regions(image.file)
+    except ServiceUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing image: {str(e)}")
+    return {
+        "filename": image.filename,
+        "score": score,
+        "prediction": "Fake" if score > 0.5 else "Real",
+        "regions": regions,
+    }
+
+
+@app.post("/predict/batch")
+async def predict_batch(
+    files: Optional[List[UploadFile]] = File(None),
+    archive: Optional[UploadFile] = File(None),
+):
+    """Scores many images and streams one NDJSON line per image as each completes.
+
+    Images come as repeated `files` parts and/or one zip `archive` (use the archive
+    beyond the 1000-part multipart limit). Lines carry the image's position in the
+    request (`index`, multipart files first), `filename`, and either `score` and
+    `prediction` or `error`. At most PREDICT_BATCH_MAX_IN_FLIGHT images are
+    decoded or queued for inference at once, so memory stays bounded however
+    many images are sent.
+    """
+    files = files or []
+    sources = []
+    for upload in files:
+        if file_size(upload.file) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"{upload.filename} exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+        sources.append((upload.filename, lambda file=upload.file: already_open(file)))
+    zip_file = None
+    if archive is not None:
+        try:
+            zip_file, entries = await io_executor.run(
+                zip_image_entries, archive.file, PREDICT_BATCH_MAX_FILES - len(sources)
+            )
+        except InvalidArchive as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        for info in entries:
+            sources.append((
+                info.filename,
+                lambda info=info: io_executor.run(read_zip_entry, zip_file, info, MAX_UPLOAD_BYTES),
+            ))
+    if not sources:
+        raise HTTPException(status_code=400, detail="No images provided")
+    if len(sources) > PREDICT_BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {PREDICT_BATCH_MAX_FILES} images per request")
+    # Fail fast with 503 rather than streaming an error line for every image
+    model_manager.check_ready()
+    # The body streams after this returns, when FastAPI has already closed the form's uploads
+    owned = [detach_upload(upload) for upload in files]
+    if archive is not None:
+        owned.append(detach_upload(archive))
+
+    async def ndjson():
+        try:
+            indexed = ((index, filename, open_fn) for index, (filename, open_fn) in enumerate(sources))
+            async for result in score_stream(indexed, score_upload, PREDICT_BATCH_MAX_IN_FLIGHT):
+                yield json.dumps(result) + "\n"
+        finally:
+            if zip_file is not None:
+                zip_file.close()
+            for file in owned:
+                file.close()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @app.post("/login")
 async def login(username: str = Form(...), password: str = Form(...)):
     """Authenticates a user by comparing the username and plain text password in DynamoDB."""
     try:
-        # Query the DynamoDB table for the user
-        response = registration_table.scan(
-            FilterExpression="username = :username",
-            ExpressionAttributeValues={":username": username}
-        )
+        # Look the user up through the username index
+        with metrics.span("dynamodb.login_query"):
+            if async_dynamodb is not None:
+                response = await async_dynamodb.query(
+                    TableName=DYNAMODB_TABLE_VALID_DATA,
+                    IndexName=REGISTRATIONS_USERNAME_INDEX,
+                    KeyConditionExpression="username = :username",
+                    ExpressionAttributeValues={":username": username},
+                )
+            else:
+                response = await io_executor.run(
+                    registration_table.query,
+                    IndexName=REGISTRATIONS_USERNAME_INDEX,
+                    KeyConditionExpression=Key("username").eq(username),
+                )
         users = response.get("Items", [])
 
         if not users:
@@ -159,12 +787,18 @@ async def login(username: str = Form(...), password: str = Form(...)):
                 "username": user["username"],
                 "email": user["email"],
                 "profile_image_url": user.get("profile_image_url", None),
+                "profile_image_variants": {
+                    label: public_url(S3_BUCKET_NAME, key, S3_REGION_NAME)
+                    for label, key in (user.get("profile_image_variants") or {}).items()
+                },
                 "timestamp": user.get("timestamp", "")  # Ensure timestamp is included
             }
         }
 
 
 
+    except ServiceUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DynamoDB Error: {str(e)}")
 
@@ -178,98 +812,148 @@ async def register(
 ):
     if not username or not email or not password or not profile_image:
         raise HTTPException(status_code=400, detail="All fields are required!")
+    check_upload_size(profile_image)
 
     try:
-        image = Image.open(profile_image.file)
-        if predict_image(image) == "Fake":
+        if await predict_upload(profile_image.file) == "Fake":
             fake_user = FakeRegistration(username=username, email=email, password=password)
-            store_in_dynamodb(fake_registrations_table, fake_user)
+            await io_executor.run(store_in_dynamodb, fake_registrations_table, fake_user)
             raise HTTPException(status_code=400, detail="The uploaded image is fake!")
 
-        # Upload real image to S3
-        image_bytes = io.BytesIO()
-        image.save(image_bytes, format="PNG")
-        image_bytes.seek(0)
-        clean_filename = profile_image.filename.replace(" ", "_")
-        s3_key = f"profile_images/{email}_{clean_filename}"
-        s3_url = upload_to_s3(image_bytes, S3_BUCKET_NAME, s3_key)
-
-        user = Registration(
-            email=email,
-            username=username,
-            password=password,
-            profile_image_url=s3_url
-        )
-        user_dict = user.dict()  # Convert Pydantic model to dictionary
-
-        # Ensure 'id' is included
-        user_dict["id"] = str(uuid.uuid4())  # Generate unique user ID
-        user_dict["timestamp"] = datetime.utcnow().isoformat()  # Add timestamp
-
-        store_in_dynamodb(registration_table, user_dict)  # Save to DynamoDB
+        # Reserve the username and email before anything is uploaded
+        user_id = str(uuid.uuid4())
+        await io_executor.run(claim_account, registration_keys_table, user_id, username, email)
 
-
-
-        # Store the dictionary directly in DynamoDB
         try:
-            registration_table.put_item(Item=user_dict)  # Save directly in DynamoDB
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"DynamoDB Error: {str(e)}")
+            # Upload real image to S3
+            clean_filename = profile_image.filename.replace(" ", "_")
+            s3_key = f"profile_images/{email}_{clean_filename}"
+            s3_url = await io_executor.run(store_original, profile_image, S3_BUCKET_NAME, s3_key)
+
+            user = Registration(
+                email=email,
+                username=username,
+                password=password,
+                profile_image_url=s3_url
+            )
+            user_dict = user.dict()  # Convert Pydantic model to dictionary
+            user_dict["id"] = user_id
+            user_dict["timestamp"] = datetime.utcnow().isoformat()  # Add timestamp
+
+            await io_executor.run(store_in_dynamodb, registration_table, user_dict)  # Save to DynamoDB
+        except Exception:
+            await io_executor.run(release_account, registration_keys_table, user_id, username, email)
+            raise
+        await io_executor.run(profile_cache.invalidate, user_dict["id"])
+        schedule_variants("profile", user_dict["id"], s3_key)
 
         return JSONResponse(status_code=200, content={
             "message": "User registered successfully!",
             "user_data": {"email": email, "username": username, "profile_image_url": s3_url},
         })
+    except ServiceUnavailable:
+        raise
+    except DuplicateAccount as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing image: {str(e)}")
 
-@app.get("/posts", response_model=list)
-def get_all_posts():
-    """Fetches all posts from DynamoDB and sorts them by timestamp (recent first)."""
-    try:
-        # Fetch all posts from DynamoDB
-        response = posts_table.scan()
-        posts = response.get("Items", [])
-
-        if not posts:
-            return []
 
-        # Fetch all users from registrations table
-        users_response = registration_table.scan()
-        users = users_response.get("Items", [])
+def feed_etag(joined_posts, next_cursor, image_width, avatar_size):
+    """Strong ETag for a feed page: post ids plus every field that can change after a post is created.
+
+    Content, authors and timestamps are immutable, so the verdict, the chosen
+    image URLs and the author's display fields are enough to tell two renderings apart.
+    """
+    parts = [next_cursor, image_width, avatar_size]
+    for post in joined_posts:
+        parts.extend((
+            post["id"], post["status"], post["post_image_url"],
+            post["user_profile_image_url"], post["username"], post["email"],
+        ))
+    return make_etag(parts)
+
+
+@app.get("/posts")
+def get_all_posts(
+    request: Request,
+    limit: int = Query(FEED_DEFAULT_PAGE_SIZE, ge=1, le=FEED_MAX_PAGE_SIZE),
+    cursor: str = Query(None),
+    since: str = Query(None),
+    before: str = Query(None),
+    image_width: int = Query(None, ge=1),
+    avatar_size: int = Query(None, ge=1),
+):
+    """Fetches one page of posts, newest first, joined with their authors' profiles.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the following page;
+    it is null once the end of the feed is reached. With `since` (a post
+    timestamp) only newer posts are returned, for refreshing a cached feed, and
+    with `before` only older ones, for paging down from a kept post. With `image_width` and
+    `avatar_size` (display size in px), image URLs point at the smallest stored
+    derivative that is large enough; `post_image_original_url` is always the original.
+
+    Responses carry an ETag (and Last-Modified, the newest post's timestamp);
+    sending it back in If-None-Match returns 304 when the page is unchanged.
+    Large bodies are gzip- or brotli-compressed per Accept-Encoding.
+    """
+    if since and before:
+        raise HTTPException(status_code=400, detail="Pass either since or before, not both")
+    try:
+        with metrics.span("dynamodb.feed_query"):
+            posts, next_cursor = query_feed_page(
+                posts_table, POSTS_FEED_INDEX, FEED_PARTITION, limit, cursor, since, before
+            )
 
-        # Create a mapping of email -> user details
-        user_dict = {user["id"]: user for user in users}
+        # Look up only the authors that appear on this page, skipping recently seen ones
+        with metrics.span("profile_cache.get_many"):
+            user_dict = profile_cache.get_many([post.get("user_id") for post in posts])
 
-        # Join posts with user details
+        # Join posts with user details, skipping posts whose author no longer exists
         joined_posts = []
         for post in posts:
-            user_id = post.get("user_id")
-            user_info = user_dict.get(user_id, {})
-
+            user_info = user_dict.get(post.get("user_id"))
             if not user_info:
                 continue
-
-            # Append post with user details
-            joined_posts.append({
-                "id": post.get("id"),
-                "user_id": user_id,
-                "username": user_info.get("username"),
-                "email": user_info.get("email"),
-                "user_profile_image_url": user_info.get("profile_image_url"),
-                "content": post.get("content"), 
-                "post_image_url": post.get("image_url"),
-                "status": post.get("status", None),
-                "timestamp": post.get("timestamp", "1970-01-01T00:00:00")  # Default timestamp if missing
-            })
-
-        # Sort posts by timestamp (newest first)
-        joined_posts.sort(key=lambda x: datetime.fromisoformat(x["timestamp"]), reverse=True)
-
-        return joined_posts
+            joined_posts.append(join_post(
+                post,
+                user_info,
+                post_image_url=variant_url("post", post, image_width),
+                profile_image_url=variant_url("profile", user_info, avatar_size),
+            ))
+
+            # Items stored before derivatives existed get them generated on first read
+            if "image_variants" not in post:
+                schedule_variants("post", post["id"], key_from_url(post.get("image_url"), S3_BUCKET_NAME_POSTS, S3_REGION_NAME))
+            if "profile_image_variants" not in user_info:
+                schedule_variants("profile", user_info["id"], key_from_url(user_info.get("profile_image_url"), S3_BUCKET_NAME, S3_REGION_NAME))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DynamoDB Error: {str(e)}")
 
+    etag = feed_etag(joined_posts, next_cursor, image_width, avatar_size)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    last_modified = http_date(joined_posts[0]["timestamp"]) if joined_posts else None
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    matched = etag_matches(request.headers.get("if-none-match"), etag)
+    if matched:
+        feed_responses.not_modified()
+        # The client's own tag names the encoding of the copy it holds
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+
+    with metrics.span("feed.serialize"):
+        body, encoding = feed_responses.get(
+            etag,
+            lambda: {"posts": joined_posts, "next_cursor": next_cursor},
+            choose_encoding(request.headers.get("accept-encoding")),
+        )
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = encoded_etag(etag, encoding)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.post("/posts")
 async def create_post(
     user_id: str = Form(...),
@@ -278,46 +962,118 @@ async def create_post(
 ):
     if not user_id or not content or not image:
         raise HTTPException(status_code=400, detail="All fields are required!")
+    check_upload_size(image)
 
     try:
-        img = Image.open(image.file)
-        
-        status = True
-        if predict_image(img) == "Fake":
-            status = False
-
-        image_bytes = io.BytesIO()
-        img.save(image_bytes, format="PNG")
-        image_bytes.seek(0)
+        if VERIFY_ASYNC:
+            # Accept now; a verification consumer scores the stored original and updates the post.
+            # Only the header is read here, so anything that is not an image is rejected as in sync mode
+            image.file.seek(0)
+            source = image.file if INFERENCE_EXECUTOR == "thread" else await io_executor.run(image.file.read)
+            await inference_executor.run(check_image, source)
+            status = PENDING
+        else:
+            status = await predict_upload(image.file) != "Fake"
+
         clean_filename = image.filename.replace(" ", "_")
+        post_id = str(uuid.uuid4())
         s3_key = f"uploads/{user_id}_{clean_filename}"
-        s3_url = upload_to_s3(image_bytes, S3_BUCKET_NAME_POSTS, s3_key)
+        if status == PENDING:
+            # The verdict is computed later from S3, so a re-upload of the same filename must not replace it
+            s3_key = f"uploads/{user_id}_{post_id}_{clean_filename}"
+        s3_url = await io_executor.run(store_original, image, S3_BUCKET_NAME_POSTS, s3_key)
 
         post = Post(user_id=user_id, content=content, image_url=s3_url, status=status)
-        store_in_dynamodb(posts_table, post)
+        post_item = await io_executor.run(store_in_dynamodb, posts_table, {**post.dict(), "id": post_id})
+        schedule_variants("post", post_item["id"], s3_key)
+        if status == PENDING:
+            with metrics.span("verification.enqueue"):
+                await asyncio.get_running_loop().run_in_executor(
+                    verification_writer,
+                    verification_queue.enqueue,
+                    post_item["id"], user_id, S3_BUCKET_NAME_POSTS, s3_key, post_item["timestamp"],
+                )
+        else:
+            with metrics.span("dynamodb.user_stats"):
+                await io_executor.run(record_post, user_stats_table, user_id, status, post_item["timestamp"])
+        schedule_publish(post_item)
 
         return JSONResponse(status_code=200, content={
             "message": "Post created successfully!",
-            "post_data": {"user_id": user_id, "content": content, "status": status, "image_url": s3_url},
+            "post_data": {
+                "id": post_item["id"], "user_id": user_id, "content": content, "status": status, "image_url": s3_url,
+            },
         })
+    except ServiceUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing image: {str(e)}")
     
+@app.get("/posts/stream")
+async def stream_posts(request: Request):
+    """Server-Sent Events feed of changes, so clients need not re-poll GET /posts.
+
+    Events: `post` (a new post, shaped like a GET /posts entry with original image
+    URLs), `verdict` ({id, status} once a pending post is verified) and `reset`
+    (events were missed: refetch GET /posts, then reconnect). Reconnecting with
+    Last-Event-ID replays recent events. Only posts created and verified by this
+    worker process are pushed.
+    """
+    subscriber = live_feed.subscribe(request.headers.get("last-event-id"))
+
+    async def events():
+        try:
+            yield f"retry: {LIVE_FEED_RETRY_MS}\n\n".encode("utf-8")
+            while True:
+                frames = await subscriber.wait(LIVE_FEED_HEARTBEAT_SECONDS)
+                if frames:
+                    yield b"".join(frames)
+                if subscriber.dropped:
+                    yield sse_frame("reset", {"reason": "slow consumer"})
+                    return
+                if not frames:
+                    if await request.is_disconnected():
+                        return
+                    yield b": keep-alive\n\n"
+        finally:
+            live_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/posts/{post_id}/status")
+def get_post_status(post_id: str):
+    """Reports a post's verification state: its status (true = real, false = fake, "pending",
+    "failed" once verification gave up) and queue job."""
+    try:
+        post = posts_table.get_item(
+            Key={"id": post_id},
+            ProjectionExpression="id, #status, verified_at",
+            ExpressionAttributeNames={"#status": "status"},
+        ).get("Item")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {str(e)}")
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    status = post.get("status")
+    return {
+        "id": post_id,
+        "status": status,
+        "prediction": None if status in (PENDING, UNVERIFIABLE) else ("Real" if status else "Fake"),
+        "verified_at": post.get("verified_at"),
+        "job": verification_queue.get(post_id) if verification_queue is not None else None,
+    }
+
+
 @app.get("/user/image-stats/{user_id}")
 def get_user_image_stats(user_id: str):
     """Fetches the count of real and fake images uploaded by a specific user."""
     try:
-        # Fetch all posts by the user
-        response = posts_table.scan(
-            FilterExpression="user_id = :user_id",
-            ExpressionAttributeValues={":user_id": user_id}
-        )
-        user_posts = response.get("Items", [])
-
-        # Count real and fake images
-        real_images = sum(1 for post in user_posts if post["status"] == True)
-        fake_images = sum(1 for post in user_posts if post["status"] == False)
-
-        return {"real_images": real_images, "fake_images": fake_images}
+        # Counters are maintained on every post, so this is a single GetItem
+        return get_stats(user_stats_table, user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DynamoDB Error: {str(e)}")
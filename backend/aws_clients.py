@@ -0,0 +1,145 @@
+"""boto3 clients with connection pools sized to their callers, tuned retries/timeouts and per-call metrics.
+
+botocore's defaults (10 pooled connections, legacy retries, 60s timeouts) make
+the pool the bottleneck once the I/O executor, multipart uploads and the
+sync-route threadpool all talk to AWS at once: extra threads block waiting for
+a connection. Every client built here records call counts, errors and latency
+per operation, reported under `aws` in GET /inference/stats.
+"""
+import contextlib
+import threading
+import time
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+
+
+def make_client_config(max_pool_connections, retry_mode="adaptive", max_attempts=5,
+                       connect_timeout=2, read_timeout=20, tcp_keepalive=True):
+    return Config(
+        max_pool_connections=max_pool_connections,
+        retries={"mode": retry_mode, "total_max_attempts": max_attempts},
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        tcp_keepalive=tcp_keepalive,
+    )
+
+
+class CallMetrics:
+    """Per-operation call counts, errors and latency, fed by botocore's before/after-call events.
+
+    Latency covers the whole API call including retries and backoff, i.e. what
+    the caller waited for.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def attach(self, client):
+        """Registers the timing hooks on a boto3 (or aiobotocore) client; returns the client."""
+        events = client.meta.events
+        events.register("before-call.*.*", self._before_call)
+        events.register("after-call.*.*", self._after_call)
+        events.register("after-call-error.*.*", self._after_call_error)
+        return client
+
+    def record(self, operation, seconds, error=False):
+        with self._lock:
+            entry = self._operations.setdefault(operation, [0, 0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += int(error)
+            entry[2] += seconds
+            entry[3] = max(entry[3], seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                operation: {
+                    "calls": calls,
+                    "errors": errors,
+                    "mean_ms": total / calls * 1000.0,
+                    "max_ms": slowest * 1000.0,
+                }
+                for operation, (calls, errors, total, slowest) in sorted(self._operations.items())
+            }
+
+    def _before_call(self, model, context, **kwargs):
+        context["metrics_call"] = (f"{model.service_model.service_name}.{model.name}", time.perf_counter())
+
+    def _after_call(self, context, http_response=None, **kwargs):
+        self._finish(context, error=http_response is not None and http_response.status_code >= 400)
+
+    def _after_call_error(self, context=None, **kwargs):
+        self._finish(context, error=True)
+
+    def _finish(self, context, error):
+        operation, started = (context or {}).pop("metrics_call", (None, None))
+        if operation is not None:
+            self.record(operation, time.perf_counter() - started, error)
+
+
+def make_session(access_key=None, secret_key=None, region_name=None):
+    return boto3.session.Session(
+        aws_access_key_id=access_key or None,
+        aws_secret_access_key=secret_key or None,
+        region_name=region_name,
+    )
+
+
+def make_client(session, service, config, metrics=None, endpoint_url=None):
+    client = session.client(service, config=config, endpoint_url=endpoint_url)
+    return metrics.attach(client) if metrics is not None else client
+
+
+def make_resource(session, service, config, metrics=None, endpoint_url=None):
+    resource = session.resource(service, config=config, endpoint_url=endpoint_url)
+    if metrics is not None:
+        metrics.attach(resource.meta.client)
+    return resource
+
+
+class AsyncDynamoDB:
+    """An aiobotocore DynamoDB client for async routes, taking and returning plain Python values.
+
+    Calls run on the event loop over aiohttp instead of occupying an I/O
+    executor thread. aiobotocore is optional; construction raises ImportError
+    without it.
+    """
+
+    def __init__(self, config, metrics=None, access_key=None, secret_key=None, region_name=None, endpoint_url=None):
+        from aiobotocore.session import get_session
+        self._session = get_session()
+        self._client_kwargs = {
+            "config": config,
+            "aws_access_key_id": access_key or None,
+            "aws_secret_access_key": secret_key or None,
+            "region_name": region_name,
+            "endpoint_url": endpoint_url,
+        }
+        self._metrics = metrics
+        self._stack = contextlib.AsyncExitStack()
+        self._client = None
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+    async def start(self):
+        client = await self._stack.enter_async_context(self._session.create_client("dynamodb", **self._client_kwargs))
+        self._client = self._metrics.attach(client) if self._metrics is not None else client
+
+    async def close(self):
+        await self._stack.aclose()
+        self._client = None
+
+    async def query(self, **kwargs):
+        """Runs one Query page; ExpressionAttributeValues and the returned Items use plain Python types."""
+        values = kwargs.pop("ExpressionAttributeValues", None)
+        if values:
+            kwargs["ExpressionAttributeValues"] = {name: self._serializer.serialize(v) for name, v in values.items()}
+        response = await self._client.query(**kwargs)
+        response["Items"] = [self._deserialize(item) for item in response.get("Items", [])]
+        return response
+
+    def _deserialize(self, item):
+        return {name: self._deserializer.deserialize(value) for name, value in item.items()}
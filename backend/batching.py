@@ -0,0 +1,195 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from executors import ExecutorSaturated
+
+
+_STOP = object()
+
+
+def bucket_sizes(max_batch_size):
+    """Returns the padded batch sizes used for forward passes (powers of two up to the max)."""
+    sizes = []
+    size = 1
+    while size < max_batch_size:
+        sizes.append(size)
+        size *= 2
+    sizes.append(max_batch_size)
+    return sizes
+
+
+def _copy_into(image_array, out):
+    np.copyto(out, image_array, casting="unsafe")
+
+
+def _resolve(future, result=None, exception=None):
+    # A waiter may have cancelled its future (e.g. the client disconnected) while the batch ran.
+    if not future.set_running_or_notify_cancel():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+class BatchPredictor:
+    """Collects single-image predictions from concurrent requests and runs them as one batch.
+
+    A batch is flushed as soon as it holds `max_batch_size` images or the oldest queued
+    image has waited `max_wait_ms`, whichever comes first. Batches are padded up to the
+    next bucket size so the model only ever sees a small, fixed set of input shapes.
+
+    Queued images are written into one preallocated float32 batch buffer by
+    `fill_fn(image, out_row)`, so callers can submit compact uint8 pixels and have
+    them normalized in place rather than allocating a float copy per request.
+
+    `on_batch(count, queue_wait, seconds)` is called after every forward pass with
+    the number of real images, how long the oldest of them waited, and the time
+    spent filling the buffer and running the model.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=10.0, input_shape=(150, 150, 3),
+                 max_queue_depth=0, retry_after=1, fill_fn=None, on_batch=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_fn = predict_fn
+        self.fill_fn = fill_fn or _copy_into
+        self.on_batch = on_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.input_shape = tuple(input_shape)
+        self.batch_sizes = bucket_sizes(max_batch_size)
+
+        self.retry_after = retry_after
+
+        # max_queue_depth=0 means unbounded; otherwise submit() sheds load once it is reached
+        self._queue = queue.Queue(maxsize=max_queue_depth)
+        self._buffer = np.zeros((max_batch_size,) + self.input_shape, dtype=np.float32)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self._batches = 0
+        self._images = 0
+
+    def start(self):
+        """Starts the flush thread (no-op if it is already running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="batch-predictor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flushes pending work and stops the flush thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, image_array):
+        """Queues one preprocessed image (HxWxC or 1xHxWxC) and returns a Future for its score."""
+        image_array = np.asarray(image_array)
+        if image_array.ndim == len(self.input_shape) + 1 and image_array.shape[0] == 1:
+            image_array = image_array[0]
+        if image_array.shape != self.input_shape:
+            raise ValueError(f"Expected input of shape {self.input_shape}, got {image_array.shape}")
+
+        if self._thread is None:
+            self.start()
+
+        future = Future()
+        try:
+            self._queue.put_nowait((image_array, future, time.monotonic()))
+        except queue.Full:
+            raise ExecutorSaturated("batch", self.retry_after)
+        return future
+
+    def submit_many(self, image_arrays):
+        """Queues several images back to back, so they share a forward pass when they fit; returns their Futures.
+
+        If the queue fills up part way, the images already queued are cancelled.
+        """
+        futures = []
+        try:
+            for image_array in image_arrays:
+                futures.append(self.submit(image_array))
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        return futures
+
+    def predict(self, image_array, timeout=None):
+        """Blocking helper: submits one image and waits for its score."""
+        return self.submit(image_array).result(timeout)
+
+    def stats(self):
+        """Returns counters describing how well requests are being coalesced."""
+        return {
+            "batches": self._batches,
+            "images": self._images,
+            "mean_batch_size": (self._images / self._batches) if self._batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._queue.maxsize,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    def _padded_size(self, count):
+        for size in self.batch_sizes:
+            if size >= count:
+                return size
+        return self.max_batch_size
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = item[2] + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Drain whatever is already queued even once the deadline has passed.
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch):
+        count = len(batch)
+        size = self._padded_size(count)
+        started = time.monotonic()
+        try:
+            for i, (image_array, _, _) in enumerate(batch):
+                self.fill_fn(image_array, self._buffer[i])
+            if size > count:
+                self._buffer[count:size] = 0.0
+            scores = np.asarray(self.predict_fn(self._buffer[:size]), dtype=np.float32).reshape(size, -1)[:, 0]
+        except Exception as e:
+            for _, future, _ in batch:
+                _resolve(future, exception=e)
+            return
+
+        self._batches += 1
+        self._images += count
+        if self.on_batch is not None:
+            self.on_batch(count, started - batch[0][2], time.monotonic() - started)
+        for (_, future, _), score in zip(batch, scores[:count]):
+            _resolve(future, result=float(score))
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import zipfile
+
+from executors import ServiceUnavailable
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+
+
+class InvalidArchive(ValueError):
+    """Raised when a bulk upload archive is not a readable zip file."""
+
+
+def zip_image_entries(file, max_entries):
+    """Opens an uploaded zip archive and returns (archive, image entries) without extracting anything."""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as e:
+        raise InvalidArchive(f"Invalid zip archive: {e}")
+    entries = [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+    if len(entries) > max_entries:
+        raise InvalidArchive(f"Archive holds {len(entries)} images; the limit is {max_entries}")
+    return archive, entries
+
+
+def read_zip_entry(archive, info, max_bytes):
+    """Reads one archive member into memory, refusing members that inflate past max_bytes."""
+    if info.file_size > max_bytes:
+        raise ValueError(f"Image exceeds {max_bytes // (1024 * 1024)} MB limit")
+    return io.BytesIO(archive.read(info))
+
+
+def detach_upload(upload):
+    """Takes an UploadFile's spooled file over and returns it; the caller must close it.
+
+    FastAPI closes form uploads as soon as the endpoint returns, before a
+    StreamingResponse body runs, so the upload is left with an empty
+    placeholder for it to close instead.
+    """
+    file = upload.file
+    upload.file = io.BytesIO()
+    return file
+
+
+async def already_open(file):
+    """open_fn for images that already sit in a seekable file, such as multipart parts."""
+    return file
+
+
+async def score_stream(sources, score_fn, max_in_flight, max_retries=3):
+    """Scores images with at most `max_in_flight` in progress; yields result dicts as they complete.
+
+    `sources` is an iterable of (index, filename, open_fn), where the async `open_fn()`
+    returns a seekable file; it is only called once the image gets a slot, so at
+    most `max_in_flight` images are held in memory at a time. A failed image
+    yields an `error` entry instead of ending the stream.
+    """
+
+    async def score_one(index, filename, open_fn):
+        result = {"index": index, "filename": filename}
+        try:
+            file = await open_fn()
+            for attempt in range(max_retries + 1):
+                try:
+                    score = await score_fn(file)
+                    break
+                except ServiceUnavailable as e:
+                    # Shared pools are momentarily full; back off rather than fail the image
+                    if attempt == max_retries:
+                        raise
+                    await asyncio.sleep(e.retry_after)
+            result.update(score=score, prediction="Fake" if score > 0.5 else "Real")
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    pending = set()
+    try:
+        for index, filename, open_fn in sources:
+            if len(pending) >= max_in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(score_one(index, filename, open_fn)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # The client went away mid-stream; stop scoring what is still queued
+        for task in pending:
+            task.cancel()
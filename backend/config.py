@@ -0,0 +1,133 @@
+"""Deployment settings for the Deepfake News Verification API."""
+
+# AWS Configuration
+AWS_ACCESS_KEY = ""
+AWS_SECRET_KEY = ""
+S3_BUCKET_NAME = "news1-bucket"
+S3_BUCKET_NAME_POSTS = "feedsbuck" 
+S3_REGION_NAME = "us-east-1"
+
+DYNAMODB_TABLE_VALID_DATA = "registrations"
+DYNAMODB_TABLE_FAKE_DATA = "fake_registrations"
+DYNAMODB_TABLE_POSTS = "posts"  
+DYNAMODB_TABLE_VERDICTS = "verdict_cache"
+DYNAMODB_TABLE_USER_STATS = "user_stats"  # per-user real/fake counters, keyed by user_id
+DYNAMODB_TABLE_REGISTRATION_KEYS = "registration_keys"  # claimed usernames/emails, keyed by "username#..."/"email#..."
+
+# Feed index: every post carries FEED_PARTITION in its `feed` attribute so the whole
+# feed can be read newest-first, one bounded page at a time, from a single GSI
+POSTS_FEED_INDEX = "feed-timestamp-index"
+REGISTRATIONS_USERNAME_INDEX = "username-index"  # login lookups
+FEED_PARTITION = "all"
+FEED_DEFAULT_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+
+# GET /posts responses: serialized once per ETag and kept with their compressed encodings
+FEED_RESPONSE_CACHE_SIZE = 256  # distinct pages (ETags) kept
+RESPONSE_COMPRESS_MIN_BYTES = 1024  # smaller bodies are sent uncompressed
+RESPONSE_GZIP_LEVEL = 6
+RESPONSE_BROTLI_QUALITY = 5  # used when the 'brotli' package is installed and the client accepts br
+
+# Author profile cache for the posts/users join; profiles may be up to TTL seconds stale
+PROFILE_CACHE_SIZE = 5000
+PROFILE_CACHE_TTL_SECONDS = 300
+PROFILE_CACHE_REDIS_URL = None  # e.g. "redis://localhost:6379/0" to share entries across workers
+
+MODEL_PATH = "fine_tuned_xception_best_model.keras"
+
+# Inference runtime: "keras", "tflite" or "onnx"; convert the Keras model with convert_model.py.
+# "remote" sends batches to inference_server.py, which holds the only copy of the model on the node
+INFERENCE_BACKEND = "keras"
+INFERENCE_SIDECAR_BACKEND = "keras"  # runtime used inside the sidecar
+INFERENCE_SIDECAR_SOCKET = "/tmp/truepix-inference.sock"
+INFERENCE_MODEL_PATHS = {
+    "keras": MODEL_PATH,
+    "tflite": "fine_tuned_xception_best_model.fp16.tflite",  # or the .int8.tflite variant
+    "onnx": "fine_tuned_xception_best_model.onnx",
+    "remote": INFERENCE_SIDECAR_SOCKET,
+}
+INFERENCE_THREADS = None  # intra-op threads for tflite/onnx; None lets the runtime decide
+
+# Uploads: originals are stored byte-for-byte; files above the threshold go up as multipart uploads
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+UPLOAD_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+UPLOAD_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+UPLOAD_MAX_CONCURRENCY = 4  # parallel part uploads per file
+
+# Image derivatives rendered in the background after upload (or on first feed read for older items),
+# stored under derivatives/<label>/ and recorded on the item; labels are widths in px
+DERIVATIVES_ENABLED = True
+POST_IMAGE_VARIANTS = {"480": 480, "1080": 1080}
+PROFILE_IMAGE_VARIANTS = {"64": 64, "128": 128}  # center-cropped squares
+DERIVATIVE_FORMAT = "WEBP"  # or "JPEG"
+DERIVATIVE_QUALITY = 80
+
+# Verdict cache: raw scores keyed by decoded-pixel hash, invalidated when the model file changes
+VERDICT_CACHE_SIZE = 10000  # in-memory LRU entries
+VERDICT_CACHE_STORE = "sqlite"  # persistent tier: "sqlite", "dynamodb" or None
+VERDICT_CACHE_SQLITE_PATH = "verdict_cache.sqlite3"
+VERDICT_CACHE_PERCEPTUAL = False  # also match near-duplicates (re-encodes/resizes) by dHash
+
+# Inference batching: a batch is flushed when it is full or its oldest image has waited this long
+BATCH_MAX_SIZE = 16
+BATCH_MAX_WAIT_MS = 10
+BATCH_MAX_QUEUE_DEPTH = 128
+
+# Face-aware region-of-interest scoring (requires the 'opencv-python-headless' package, not in
+# requirements.txt; pip install it before enabling): faces are cropped from a
+# ROI_WORK_SIZE decode and scored with the full frame in one batch; the verdict aggregates them
+ROI_ENABLED = False
+ROI_WORK_SIZE = 1024  # px; JPEGs are draft-decoded to the smallest scale at least this large
+ROI_DETECT_SIZE = 512  # px; longest side of the grayscale copy the face detector scans
+ROI_MIN_FACE_PX = 24  # smallest face the detector reports, in detection pixels
+ROI_MAX_REGIONS = 7  # faces scored per image (largest first); keep below BATCH_MAX_SIZE
+ROI_MARGIN = 0.25  # context added around each face, as a fraction of its size per side
+ROI_INCLUDE_FULL_FRAME = True  # also score the whole picture (always done when no face is found)
+ROI_AGGREGATE = "max"  # "max" or "mean" of the region scores
+
+# Execution model: blocking work never runs on the event loop
+IO_POOL_SIZE = 16  # threads for boto3 S3/DynamoDB calls
+IO_MAX_PENDING = 64
+INFERENCE_EXECUTOR = "thread"  # "thread" or "process" (decode/preprocess in worker processes)
+INFERENCE_WORKERS = 4
+INFERENCE_MAX_PENDING = 32
+RETRY_AFTER_SECONDS = 1  # Retry-After sent with 503s when a pool is saturated
+MODEL_RETRY_AFTER_SECONDS = 5  # Retry-After sent while the model is still loading
+
+# AWS clients: connection pools sized to the threads that use them (botocore defaults to 10)
+AWS_S3_MAX_POOL_CONNECTIONS = IO_POOL_SIZE * UPLOAD_MAX_CONCURRENCY  # every I/O thread mid multipart upload
+AWS_DYNAMODB_MAX_POOL_CONNECTIONS = IO_POOL_SIZE + 40  # I/O threads plus FastAPI's sync-route threadpool
+AWS_RETRY_MODE = "adaptive"  # "standard", "adaptive" (client-side rate limiting on throttles) or "legacy"
+AWS_MAX_ATTEMPTS = 5  # including the first attempt
+AWS_CONNECT_TIMEOUT = 2
+AWS_READ_TIMEOUT = 20
+AWS_ENDPOINT_URLS = {"s3": None, "dynamodb": None}  # e.g. a moto server or local DynamoDB for testing
+AWS_ASYNC_CLIENTS = False  # serve DynamoDB calls of async routes from aiobotocore (if installed)
+
+# Instrumentation: Prometheus histograms/gauges on GET /metrics (needs prometheus_client); each uvicorn
+# worker keeps its own registry, so scrape workers individually or run one worker per container
+METRICS_ENABLED = True
+METRICS_TRACE_REQUESTS = False  # log one line per request with the time spent in each stage
+METRICS_TRACE_MIN_MS = 0  # only trace requests at least this slow
+
+# Asynchronous verification: accept posts immediately as "pending" and verify them from a local
+# SQLite job queue, either in the API process (VERIFICATION_CONSUMERS per worker) or in separate
+# `python verification_worker.py` processes sharing the same queue file
+VERIFY_ASYNC = False
+VERIFICATION_QUEUE_PATH = "verification_jobs.sqlite3"
+VERIFICATION_CONSUMERS = 4  # 0 to leave verification entirely to verification_worker.py
+VERIFICATION_POLL_SECONDS = 0.5
+VERIFICATION_LEASE_SECONDS = 300  # a claimed job is handed out again if not finished by then
+VERIFICATION_MAX_ATTEMPTS = 5
+VERIFICATION_RETENTION_SECONDS = 24 * 3600  # finished jobs are kept this long for /posts/{id}/status
+
+# Live feed (GET /posts/stream, Server-Sent Events): new posts and verdicts pushed from this worker
+LIVE_FEED_MAX_SUBSCRIBERS = 5000  # open streams per worker; more are refused with 503
+LIVE_FEED_BUFFER = 64  # events queued for one client before it is dropped as too slow
+LIVE_FEED_REPLAY = 1024  # recent events kept for clients reconnecting with Last-Event-ID
+LIVE_FEED_HEARTBEAT_SECONDS = 15  # keep-alive comment on idle streams (also detects closed ones)
+LIVE_FEED_RETRY_MS = 3000  # reconnect delay suggested to EventSource clients
+
+# Bulk verification (POST /predict/batch): images decoded or awaiting inference at once, per request
+PREDICT_BATCH_MAX_IN_FLIGHT = 16  # below INFERENCE_MAX_PENDING so one bulk request cannot starve the rest
+PREDICT_BATCH_MAX_FILES = 10000
@@ -0,0 +1,90 @@
+"""Converts the Keras model into the TFLite/ONNX files served by inference_backends.py.
+
+Usage (from the backend directory):
+
+    python convert_model.py tflite --quantize fp16    # -> fine_tuned_xception_best_model.fp16.tflite
+    python convert_model.py tflite --quantize int8    # dynamic-range int8 weights
+    python convert_model.py onnx                       # needs tf2onnx
+    python convert_model.py onnx --quantize int8       # also needs onnxruntime
+
+Point INFERENCE_BACKEND / INFERENCE_MODEL_PATHS in config.py at the output, and
+compare accuracy and latency first with benchmarks/compare_backends.py.
+"""
+import argparse
+import os
+
+import numpy as np
+
+from config import MODEL_PATH
+from inference_backends import load_backend
+from preprocessing import INPUT_SHAPE
+
+
+def output_path(source, quantize, extension):
+    stem = os.path.splitext(source)[0]
+    suffix = f".{quantize}" if quantize != "none" else ""
+    return f"{stem}{suffix}.{extension}"
+
+
+def convert_tflite(model, out, quantize):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize != "none":
+        # Optimize.DEFAULT without a representative dataset is dynamic-range quantization:
+        # int8 weights, float activations, so no calibration images are needed
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+    with open(out, "wb") as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(model, out, quantize, opset):
+    import tensorflow as tf
+    import tf2onnx
+
+    signature = [tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name="input")]
+    if quantize == "none":
+        tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=out)
+        return
+    if quantize != "int8":
+        raise SystemExit("ONNX export supports --quantize none or int8")
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    float_path = os.path.splitext(out)[0] + ".float.onnx"
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=float_path)
+    quantize_dynamic(float_path, out, weight_type=QuantType.QInt8)
+
+
+def check_parity(reference, backend_name, path, samples=8):
+    """Prints how far the converted model's scores drift from the Keras model on random inputs."""
+    batch = np.random.default_rng(0).uniform(-1.0, 1.0, size=(samples,) + INPUT_SHAPE).astype(np.float32)
+    expected = np.asarray(reference.predict_on_batch(batch), dtype=np.float32).reshape(samples, -1)
+    actual = load_backend(backend_name, path).predict(batch)
+    print(f"max |score diff| vs keras on {samples} random inputs: {float(np.abs(expected - actual).max()):.5f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("format", choices=["tflite", "onnx"])
+    parser.add_argument("--source", default=MODEL_PATH, help="Keras model to convert")
+    parser.add_argument("--quantize", choices=["none", "fp16", "int8"], default="none")
+    parser.add_argument("--output", help="defaults to <source>.<quantize>.<format>")
+    parser.add_argument("--opset", type=int, default=13, help="ONNX opset")
+    args = parser.parse_args(argv)
+
+    from tensorflow.keras.models import load_model
+
+    model = load_model(args.source)
+    out = args.output or output_path(args.source, args.quantize, args.format)
+    if args.format == "tflite":
+        convert_tflite(model, out, args.quantize)
+    else:
+        convert_onnx(model, out, args.quantize, args.opset)
+    print(f"wrote {out} ({os.path.getsize(out) / 2 ** 20:.1f} MiB, source {os.path.getsize(args.source) / 2 ** 20:.1f} MiB)")
+    check_parity(model, args.format, out)
+
+
+if __name__ == "__main__":
+    main()
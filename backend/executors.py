@@ -0,0 +1,97 @@
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ServiceUnavailable(Exception):
+    """Base for conditions the API reports as 503 with a Retry-After header."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ExecutorSaturated(ServiceUnavailable):
+    """Raised when an executor already has its maximum number of queued and running tasks."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} executor is saturated, retry in {retry_after}s", retry_after)
+        self.name = name
+
+
+class BoundedExecutor:
+    """Wraps a thread or process pool with a hard cap on queued + running tasks.
+
+    Submissions beyond `max_pending` fail fast with ExecutorSaturated instead of
+    queueing without bound, so callers can shed load (e.g. reply 503) early.
+    With `copy_context`, tasks run in a copy of the submitter's contextvars (thread
+    pools only; e.g. so metrics spans land in the submitting request's trace).
+    """
+
+    def __init__(self, name, executor, max_pending, retry_after=1, copy_context=False):
+        self.name = name
+        self.copy_context = copy_context
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor = executor
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Submits fn to the pool, raising ExecutorSaturated if no slot is free."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorSaturated(self.name, self.retry_after)
+        with self._lock:
+            self._pending += 1
+        if self.copy_context:
+            fn, args = contextvars.copy_context().run, (fn,) + args
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs fn on the pool and awaits its result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+
+def make_io_executor(pool_size, max_pending, retry_after=1):
+    """Thread pool for blocking boto3 calls (S3 uploads, DynamoDB reads/writes)."""
+    pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="aws-io")
+    return BoundedExecutor("io", pool, max_pending, retry_after, copy_context=True)
+
+
+def make_inference_executor(kind, workers, max_pending, retry_after=1):
+    """Pool for CPU-bound inference work; `kind` is "thread" or "process"."""
+    if kind == "thread":
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+    elif kind == "process":
+        # spawn keeps TensorFlow/boto3 state from being forked into the workers
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        raise ValueError(f"Unknown inference executor kind: {kind!r}")
+    return BoundedExecutor("inference", pool, max_pending, retry_after, copy_context=kind == "thread")
@@ -0,0 +1,109 @@
+import base64
+import json
+import time
+
+from boto3.dynamodb.conditions import Key
+
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_LIMIT = 100
+
+USER_PROFILE_FIELDS = ("id", "username", "email", "profile_image_url", "profile_image_variants")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a feed cursor cannot be decoded."""
+
+
+def encode_cursor(last_evaluated_key):
+    """Turns a DynamoDB LastEvaluatedKey into an opaque URL-safe cursor."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; returns None for an empty cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if not isinstance(key, dict) or not all(isinstance(v, str) for v in key.values()):
+        raise InvalidCursor("Invalid cursor")
+    return key
+
+
+def query_feed_page(posts_table, index_name, partition, limit, cursor=None, since=None, before=None):
+    """Reads one page of posts, newest first, from the feed GSI.
+
+    With `since` (an ISO timestamp) only posts strictly newer than it are read, so
+    clients holding a cached feed can fetch just what was added; with `before`
+    only strictly older ones, so clients can page down from the oldest post they
+    kept. Returns (posts, next_cursor); next_cursor is None on the last page.
+    """
+    condition = Key("feed").eq(partition)
+    if since:
+        condition = condition & Key("timestamp").gt(since)
+    elif before:
+        condition = condition & Key("timestamp").lt(before)
+    kwargs = {
+        "IndexName": index_name,
+        "KeyConditionExpression": condition,
+        "ScanIndexForward": False,
+        "Limit": limit,
+    }
+    start_key = decode_cursor(cursor)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    response = posts_table.query(**kwargs)
+    return response.get("Items", []), encode_cursor(response.get("LastEvaluatedKey"))
+
+
+def batch_get_users(dynamodb, table_name, user_ids, max_retries=5):
+    """Fetches profile fields for the given user ids with BatchGetItem; returns {id: user}."""
+    users = {}
+    ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+    for start in range(0, len(ids), BATCH_GET_LIMIT):
+        request = {
+            table_name: {
+                "Keys": [{"id": user_id} for user_id in ids[start:start + BATCH_GET_LIMIT]],
+                "ProjectionExpression": ", ".join(f"#{field}" for field in USER_PROFILE_FIELDS),
+                "ExpressionAttributeNames": {f"#{field}": field for field in USER_PROFILE_FIELDS},
+            }
+        }
+        for attempt in range(max_retries + 1):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for user in response.get("Responses", {}).get(table_name, []):
+                users[user["id"]] = user
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            # Throttled keys come back unprocessed; back off before retrying them
+            time.sleep(min(0.05 * (2 ** attempt), 1.0))
+        else:
+            raise RuntimeError("BatchGetItem left keys unprocessed after retries")
+    return users
+
+
+def join_post(post, user_info, post_image_url=None, profile_image_url=None):
+    """Shapes a post item plus its author's profile into the feed response format.
+
+    The image URLs default to the originals; callers pass a derivative's URL to
+    serve an image sized for the display slot instead.
+    """
+    return {
+        "id": post.get("id"),
+        "user_id": post.get("user_id"),
+        "username": user_info.get("username"),
+        "email": user_info.get("email"),
+        "user_profile_image_url": profile_image_url or user_info.get("profile_image_url"),
+        "content": post.get("content"),
+        "post_image_url": post_image_url or post.get("image_url"),
+        "post_image_original_url": post.get("image_url"),
+        "status": post.get("status", None),
+        "timestamp": post.get("timestamp", "1970-01-01T00:00:00"),  # Default timestamp if missing
+    }
@@ -0,0 +1,180 @@
+"""Compact JSON, ETags and compression for large, cacheable GET responses (the feed).
+
+Bodies are serialized once with orjson when it is installed (the stdlib json
+module with compact separators otherwise) and kept, with their gzip/brotli
+encodings, in a small LRU keyed by ETag, so clients asking for an unchanged
+page cost neither a re-serialization nor a re-compression, and clients that
+send the ETag back in If-None-Match get an empty 304.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+from email.utils import format_datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serializes to compact UTF-8 JSON bytes; DynamoDB Decimals become numbers."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(parts):
+    """Strong ETag over an iterable of strings (None allowed)."""
+    joined = "\x1f".join("\x00" if part is None else str(part) for part in parts)
+    return f'"{hashlib.sha1(joined.encode("utf-8")).hexdigest()}"'
+
+
+ENCODINGS = ("gzip", "br")
+
+
+def encoded_etag(etag, encoding):
+    """Tags a compressed body: a strong ETag must differ per content-coding (RFC 9110 8.8.3)."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def etag_matches(if_none_match, etag):
+    """Returns the If-None-Match entry matching `etag` (without W/), or None.
+
+    If-None-Match uses weak comparison, so a W/ prefix on either side is ignored,
+    and so is a content-coding suffix added by encoded_etag: every encoding of
+    the page is equally fresh.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        unencoded = candidate
+        for encoding in ENCODINGS:
+            if candidate.endswith(f'-{encoding}"'):
+                unencoded = candidate[:-len(encoding) - 2] + '"'
+        if bare in (candidate, unencoded):
+            return candidate
+    return None
+
+
+def http_date(timestamp):
+    """Formats a stored (naive UTC) ISO timestamp as an HTTP date; None if it cannot be parsed."""
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return format_datetime(parsed.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def choose_encoding(accept_encoding):
+    """Picks "br" (when brotli is installed), "gzip" or None from an Accept-Encoding header."""
+    accepted = set()
+    for entry in (accept_encoding or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class EncodedResponseCache:
+    """LRU of serialized bodies by ETag, each with the compressed encodings requested so far.
+
+    Bodies shorter than `min_bytes` are always sent uncompressed; the framing
+    overhead outweighs the savings.
+    """
+
+    def __init__(self, max_entries=256, min_bytes=1024, gzip_level=6, brotli_quality=5):
+        self.max_entries = max_entries
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._bytes_raw = 0
+        self._bytes_sent = 0
+
+    def not_modified(self):
+        with self._lock:
+            self._not_modified += 1
+
+    def get(self, etag, build, encoding):
+        """Returns (body, encoding actually used); `build()` produces the object to serialize on a miss."""
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+                self._hits += 1
+        if entry is None:
+            entry = {None: dumps(build())}
+            with self._lock:
+                self._misses += 1
+                self._entries[etag] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        raw = entry[None]
+        if encoding is None or len(raw) < self.min_bytes:
+            encoding = None
+        elif encoding not in entry:
+            # Racing requests may both compress; the results are identical
+            entry[encoding] = self._compress(raw, encoding)
+        body = entry[encoding]
+        with self._lock:
+            self._bytes_raw += len(raw)
+            self._bytes_sent += len(body)
+        return body, encoding
+
+    def _compress(self, raw, encoding):
+        if encoding == "br":
+            return brotli.compress(raw, quality=self.brotli_quality)
+        return gzip.compress(raw, compresslevel=self.gzip_level, mtime=0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "bytes_raw": self._bytes_raw,
+                "bytes_sent": self._bytes_sent,
+                "json_encoder": "orjson" if orjson is not None else "json",
+                "brotli": brotli is not None,
+            }
@@ -0,0 +1,251 @@
+"""Bulk account import: verifies profile images in batches and writes registrations with batch_writer.
+
+Usage (from the backend directory):
+
+    python import_users.py newsroom.csv [--batch-size 16] [--workers 16] [--report results.jsonl]
+    python import_users.py newsroom.jsonl --dry-run     # verify images only, write nothing
+
+Input is CSV with a header row, or JSON Lines, with `email`, `username`,
+`password` and `profile_image` (a path, relative to the input file's folder).
+Each chunk of --batch-size accounts is scored in one forward pass. Accounts
+with a fake profile image go to the fake registrations table, as with
+POST /register. For the rest the username and email are reserved with
+conditional writes to the registration keys table (a name already taken, in
+the table or earlier in the file, is reported as a duplicate), the image is
+uploaded to S3 and the accounts are written with batch_writer. Every row's
+outcome is printed in the summary and optionally written to --report.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from config import (
+    AWS_ACCESS_KEY,
+    AWS_SECRET_KEY,
+    S3_BUCKET_NAME,
+    S3_REGION_NAME,
+    DYNAMODB_TABLE_VALID_DATA,
+    DYNAMODB_TABLE_FAKE_DATA,
+    DYNAMODB_TABLE_REGISTRATION_KEYS,
+    INFERENCE_BACKEND,
+    INFERENCE_MODEL_PATHS,
+    INFERENCE_THREADS,
+    BATCH_MAX_SIZE,
+    MAX_UPLOAD_BYTES,
+    AWS_RETRY_MODE,
+    AWS_MAX_ATTEMPTS,
+    AWS_CONNECT_TIMEOUT,
+    AWS_READ_TIMEOUT,
+    AWS_ENDPOINT_URLS,
+)
+from aws_clients import make_client, make_client_config, make_resource, make_session
+from inference_backends import load_backend
+from preprocessing import INPUT_SHAPE, preprocess_into
+from registrations import DuplicateAccount, claim_account, release_account
+from storage import detect_content_type, public_url, upload_original
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("email", "username", "password", "profile_image")
+
+
+def read_accounts(path):
+    """Returns the rows of a CSV or JSON Lines file as dicts."""
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def validate(rows, base_dir):
+    """Splits rows into (accounts, rejected); duplicates within the file keep the first occurrence."""
+    accounts, rejected = [], []
+    usernames, emails = set(), set()
+    for line, row in enumerate(rows, start=1):
+        missing = [field for field in FIELDS if not str(row.get(field) or "").strip()]
+        email = str(row.get("email") or "").strip()
+        username = str(row.get("username") or "").strip()
+        if missing:
+            rejected.append({"line": line, "username": username, "result": "invalid", "error": f"missing {', '.join(missing)}"})
+        elif username in usernames or email.lower() in emails:
+            rejected.append({"line": line, "username": username, "result": "duplicate", "error": "repeated in input"})
+        else:
+            usernames.add(username)
+            emails.add(email.lower())
+            accounts.append({
+                "line": line,
+                "email": email,
+                "username": username,
+                "password": row["password"],
+                "image_path": os.path.join(base_dir, row["profile_image"]),
+            })
+    return accounts, rejected
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Importer:
+    """Imports accounts one chunk at a time; the chunk's images share one preallocated batch buffer."""
+
+    def __init__(self, backend, s3_client, dynamodb, pool, batch_size=BATCH_MAX_SIZE, dry_run=False):
+        self.backend = backend
+        self.s3_client = s3_client
+        self.registrations = dynamodb.Table(DYNAMODB_TABLE_VALID_DATA)
+        self.fake_registrations = dynamodb.Table(DYNAMODB_TABLE_FAKE_DATA)
+        self.keys_table = dynamodb.Table(DYNAMODB_TABLE_REGISTRATION_KEYS)
+        self.pool = pool
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self._batch = np.empty((batch_size,) + INPUT_SHAPE, dtype=np.float32)
+
+    def import_chunk(self, accounts):
+        """Verifies, reserves, uploads and writes one chunk; returns one result dict per account."""
+        results = []
+        loaded, rows = [], []
+        errors = self.pool.map(self._load, accounts, range(len(accounts)))
+        for row, (account, error) in enumerate(zip(accounts, errors)):
+            if error:
+                results.append(self._result(account, "invalid", error))
+            else:
+                loaded.append(account)
+                rows.append(row)
+        if not loaded:
+            return results
+
+        # Each image was decoded into the batch row matching its position in `accounts`
+        scores = self.backend.predict(self._batch[rows])[:, 0]
+        now = datetime.utcnow().isoformat()
+        real, fake = [], []
+        for account, score in zip(loaded, scores):
+            account["id"] = str(uuid.uuid4())
+            account["timestamp"] = now
+            (fake if score > 0.5 else real).append(account)
+        results.extend(self._result(account, "fake") for account in fake)
+        if self.dry_run:
+            results.extend(self._result(account, "verified") for account in real)
+            return results
+
+        if fake:
+            with self.fake_registrations.batch_writer() as batch:
+                for account in fake:
+                    batch.put_item(Item={
+                        "id": account["id"], "email": account["email"], "username": account["username"],
+                        "password": account["password"], "timestamp": now,
+                    })
+
+        stored = []
+        for account, error in zip(real, self.pool.map(self._claim_and_upload, real)):
+            if error:
+                results.append(self._result(account, *error))
+            else:
+                stored.append(account)
+        try:
+            with self.registrations.batch_writer() as batch:
+                for account in stored:
+                    batch.put_item(Item={
+                        "id": account["id"], "email": account["email"], "username": account["username"],
+                        "password": account["password"], "profile_image_url": account["profile_image_url"],
+                        "timestamp": now,
+                    })
+        except Exception as e:
+            # Unsure which items landed; free the reservations of the ones that did not
+            for account in stored:
+                if "Item" not in self.registrations.get_item(Key={"id": account["id"]}, ProjectionExpression="id"):
+                    release_account(self.keys_table, account["id"], account["username"], account["email"])
+                    results.append(self._result(account, "error", str(e)))
+                else:
+                    results.append(self._result(account, "created"))
+            return results
+        results.extend(self._result(account, "created") for account in stored)
+        return results
+
+    def _load(self, account, row):
+        try:
+            if os.path.getsize(account["image_path"]) > MAX_UPLOAD_BYTES:
+                return f"image exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"
+            with open(account["image_path"], "rb") as f:
+                preprocess_into(f, self._batch[row])
+        except Exception as e:
+            return f"could not read image: {e}"
+        return None
+
+    def _claim_and_upload(self, account):
+        """Returns None on success or a (result, error) pair."""
+        try:
+            claim_account(self.keys_table, account["id"], account["username"], account["email"])
+        except DuplicateAccount as e:
+            return "duplicate", str(e)
+        except Exception as e:
+            return "error", str(e)
+        try:
+            filename = os.path.basename(account["image_path"]).replace(" ", "_")
+            key = f"profile_images/{account['email']}_{filename}"
+            with open(account["image_path"], "rb") as f:
+                content_type = detect_content_type(f)
+                upload_original(self.s3_client, f, S3_BUCKET_NAME, key, content_type, None)
+            account["profile_image_url"] = public_url(S3_BUCKET_NAME, key, S3_REGION_NAME)
+        except Exception as e:
+            release_account(self.keys_table, account["id"], account["username"], account["email"])
+            return "error", f"upload failed: {e}"
+        return None
+
+    @staticmethod
+    def _result(account, result, error=None):
+        entry = {"line": account["line"], "username": account["username"], "result": result}
+        if "id" in account and result == "created":
+            entry["id"] = account["id"]
+        if error:
+            entry["error"] = error
+        return entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or JSON Lines file of accounts")
+    parser.add_argument("--batch-size", type=int, default=BATCH_MAX_SIZE)
+    parser.add_argument("--workers", type=int, default=16, help="threads for image reads, claims and uploads")
+    parser.add_argument("--dry-run", action="store_true", help="verify images without writing anything")
+    parser.add_argument("--report", help="write one JSON line per input row to this file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    accounts, results = validate(read_accounts(args.input), os.path.dirname(os.path.abspath(args.input)))
+    session = make_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_REGION_NAME)
+    config = make_client_config(args.workers, AWS_RETRY_MODE, AWS_MAX_ATTEMPTS, AWS_CONNECT_TIMEOUT, AWS_READ_TIMEOUT)
+    s3_client = make_client(session, "s3", config, endpoint_url=AWS_ENDPOINT_URLS["s3"])
+    dynamodb = make_resource(session, "dynamodb", config, endpoint_url=AWS_ENDPOINT_URLS["dynamodb"])
+    backend = load_backend(INFERENCE_BACKEND, INFERENCE_MODEL_PATHS[INFERENCE_BACKEND], num_threads=INFERENCE_THREADS)
+
+    total = len(accounts) + len(results)
+    started = time.monotonic()
+    with ThreadPoolExecutor(args.workers, thread_name_prefix="import") as pool:
+        importer = Importer(backend, s3_client, dynamodb, pool, args.batch_size, args.dry_run)
+        for chunk in chunks(accounts, args.batch_size):
+            results.extend(importer.import_chunk(chunk))
+            logger.info("%d/%d rows processed", len(results), total)
+    elapsed = time.monotonic() - started
+
+    results.sort(key=lambda result: result["line"])
+    if args.report:
+        with open(args.report, "w") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    counts = {}
+    for result in results:
+        counts[result["result"]] = counts.get(result["result"], 0) + 1
+    print(", ".join(f"{count} {result}" for result, count in sorted(counts.items())) + f" in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
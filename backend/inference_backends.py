@@ -0,0 +1,221 @@
+"""Interchangeable runtimes for the fake-image classifier.
+
+Every backend takes a float32 batch shaped (n, 150, 150, 3), already normalized
+to [-1, 1], and returns an array of n raw scores shaped (n, 1). They differ only
+in the runtime: full Keras, a TFLite flatbuffer (float16 or int8 dynamic-range
+quantized, see convert_model.py), an ONNX Runtime session, or a remote sidecar
+process (inference_server.py) that holds one shared copy of the model.
+"""
+import json
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from verdict_cache import file_version
+
+
+class KerasBackend:
+    """The original SavedModel/.keras file run through TensorFlow."""
+
+    name = "keras"
+    modules = ("tensorflow",)
+
+    def __init__(self, path):
+        from tensorflow.keras.models import load_model
+        self._model = load_model(path)
+
+    def predict(self, batch):
+        return np.asarray(self._model.predict_on_batch(batch), dtype=np.float32).reshape(len(batch), -1)
+
+
+def _tflite_interpreter_class():
+    # tflite-runtime is a few MB and avoids importing all of TensorFlow into the worker
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite import Interpreter
+    return Interpreter
+
+
+class TFLiteBackend:
+    """A converted .tflite model; the flatbuffer is memory-mapped rather than copied per worker."""
+
+    name = "tflite"
+    modules = ()
+
+    def __init__(self, path, num_threads=None):
+        self._interpreter = _tflite_interpreter_class()(model_path=path, num_threads=num_threads)
+        self._input = self._interpreter.get_input_details()[0]["index"]
+        self._output = self._interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+        # The interpreter is not thread-safe, and resizing the input reallocates its tensors
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        with self._lock:
+            if len(batch) != self._batch_size:
+                self._interpreter.resize_tensor_input(self._input, batch.shape, strict=False)
+                self._interpreter.allocate_tensors()
+                self._batch_size = len(batch)
+            self._interpreter.set_tensor(self._input, batch)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output).astype(np.float32).reshape(len(batch), -1)
+
+
+class ONNXBackend:
+    """A converted .onnx model run on ONNX Runtime's CPU execution provider."""
+
+    name = "onnx"
+    modules = ("onnxruntime",)
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self._session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._input = self._session.get_inputs()[0].name
+
+    def predict(self, batch):
+        outputs = self._session.run(None, {self._input: np.ascontiguousarray(batch, dtype=np.float32)})
+        return np.asarray(outputs[0], dtype=np.float32).reshape(len(batch), -1)
+
+
+def send_frame(sock, header, array=None):
+    """Writes one length-prefixed JSON header, followed by the raw bytes of `array` if given."""
+    if array is not None:
+        array = np.ascontiguousarray(array, dtype=np.float32)
+        header = dict(header, shape=list(array.shape))
+    raw = json.dumps(header).encode()
+    sock.sendall(struct.pack(">I", len(raw)) + raw)
+    if array is not None:
+        sock.sendall(memoryview(array).cast("B"))
+
+
+def _recv_exactly(sock, view):
+    while len(view):
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError("inference socket closed mid-frame")
+        view = view[received:]
+
+
+def recv_frame(sock):
+    """Reads one frame written by send_frame; returns (header, float32 array or None)."""
+    prefix = bytearray(4)
+    _recv_exactly(sock, memoryview(prefix))
+    raw = bytearray(struct.unpack(">I", prefix)[0])
+    _recv_exactly(sock, memoryview(raw))
+    header = json.loads(raw)
+    if "shape" not in header:
+        return header, None
+    # Received straight into the array's buffer, no intermediate bytes copy
+    array = np.empty(header["shape"], dtype=np.float32)
+    _recv_exactly(sock, memoryview(array).cast("B"))
+    return header, array
+
+
+class RemoteBackend:
+    """Forwards batches over a Unix socket to the shared inference sidecar (inference_server.py).
+
+    The worker never imports a framework or holds weights; one sidecar process
+    owns the only copy of the model for every worker on the node.
+    """
+
+    name = "remote"
+    modules = ()
+
+    def __init__(self, path, num_threads=None, connect_timeout=300.0):
+        self.path = path
+        self.connect_timeout = connect_timeout
+        self._sock = None
+        self._connected = False
+        self._lock = threading.Lock()
+
+    def info(self):
+        """Returns the sidecar's backend name, model path and model version."""
+        with self._lock:
+            return self._call({"op": "info"})[0]
+
+    def predict(self, batch):
+        with self._lock:
+            _, scores = self._call({"op": "predict"}, batch)
+        return scores.reshape(len(batch), -1)
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _call(self, header, array=None):
+        for attempt in range(2):
+            if self._sock is None:
+                self._connect()
+            try:
+                send_frame(self._sock, header, array)
+                response, result = recv_frame(self._sock)
+                break
+            except OSError:
+                # The sidecar restarted; reconnect once and resend
+                self._disconnect()
+                if attempt:
+                    raise
+        if response.get("error"):
+            raise RuntimeError(f"inference sidecar: {response['error']}")
+        return response, result
+
+    def _connect(self):
+        # At startup the sidecar may still be loading the model (it binds the socket only once
+        # ready), so wait for it; after that, fail fast rather than stall requests
+        deadline = time.monotonic() + (0 if self._connected else self.connect_timeout)
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+                self._sock = sock
+                self._connected = True
+                return
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+BACKENDS = {backend.name: backend for backend in (KerasBackend, TFLiteBackend, ONNXBackend, RemoteBackend)}
+
+
+def backend_class(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference backend: {name!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def load_backend(name, path, num_threads=None):
+    """Instantiates the named backend for the model file at `path`."""
+    cls = backend_class(name)
+    if cls is KerasBackend:
+        return cls(path)
+    return cls(path, num_threads=num_threads)
+
+
+def backend_version(name, path):
+    """Fingerprints the weights a backend will serve; a remote backend asks the sidecar for its own."""
+    if backend_class(name) is RemoteBackend:
+        backend = RemoteBackend(path)
+        try:
+            return backend.info()["model_version"]
+        finally:
+            backend.close()
+    return file_version(path)
@@ -0,0 +1,106 @@
+"""Inference sidecar: one process holds the model and serves every API worker on the node.
+
+Usage (from the backend directory):
+
+    python inference_server.py                       # INFERENCE_SIDECAR_BACKEND from config.py
+    python inference_server.py --backend tflite --model fine_tuned_xception_best_model.fp16.tflite
+    uvicorn app:app --workers 8                      # with INFERENCE_BACKEND = "remote"
+
+Workers connect with inference_backends.RemoteBackend over a Unix socket and send
+already-batched, normalized float32 inputs, so each additional worker costs only
+the web framework's baseline memory rather than a copy of the weights. The
+socket is bound only after the model is loaded and warmed up.
+"""
+import argparse
+import logging
+import os
+import socketserver
+import threading
+
+from config import (
+    INFERENCE_MODEL_PATHS,
+    INFERENCE_SIDECAR_BACKEND,
+    INFERENCE_SIDECAR_SOCKET,
+    INFERENCE_THREADS,
+    BATCH_MAX_SIZE,
+)
+from batching import bucket_sizes
+from inference_backends import backend_class, load_backend, recv_frame, send_frame
+from model_manager import ModelManager
+from preprocessing import INPUT_SHAPE
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceHandler(socketserver.BaseRequestHandler):
+    """Serves one worker connection: a sequence of info/predict frames until the worker disconnects."""
+
+    def handle(self):
+        manager = self.server.model_manager
+        while True:
+            try:
+                header, batch = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                if header.get("op") == "info":
+                    send_frame(self.request, {"backend": self.server.backend_name, **manager.status()})
+                elif header.get("op") == "predict" and batch is not None:
+                    # Backends are not all thread-safe; workers already send whole batches
+                    with self.server.predict_lock:
+                        scores = manager.predict(batch)
+                    send_frame(self.request, {}, scores)
+                else:
+                    send_frame(self.request, {"error": f"unknown request: {header.get('op')!r}"})
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                logger.exception("Inference request failed")
+                send_frame(self.request, {"error": f"{type(e).__name__}: {e}"})
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, model_manager, backend_name):
+        self.model_manager = model_manager
+        self.backend_name = backend_name
+        self.predict_lock = threading.Lock()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a previous run
+        super().__init__(socket_path, InferenceHandler)
+        os.chmod(socket_path, 0o660)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=INFERENCE_SIDECAR_BACKEND, choices=["keras", "tflite", "onnx"])
+    parser.add_argument("--model", help="model file (defaults to INFERENCE_MODEL_PATHS[backend])")
+    parser.add_argument("--socket", default=INFERENCE_SIDECAR_SOCKET)
+    parser.add_argument("--threads", type=int, default=INFERENCE_THREADS, help="intra-op threads for tflite/onnx")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    manager = ModelManager(
+        args.model or INFERENCE_MODEL_PATHS[args.backend],
+        lambda path: load_backend(args.backend, path, num_threads=args.threads),
+        lambda backend, batch: backend.predict(batch),
+        warmup_batch_sizes=bucket_sizes(BATCH_MAX_SIZE),
+        input_shape=INPUT_SHAPE,
+        preload_modules=backend_class(args.backend).modules,
+    )
+    manager.start()
+    if not manager.wait():
+        raise SystemExit(f"Model failed to load: {manager.error}")
+    logger.info("Model ready: %s", manager.status())
+
+    with InferenceServer(args.socket, manager, args.backend) as server:
+        logger.info("Serving %s inference on %s", args.backend, args.socket)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
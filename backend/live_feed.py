@@ -0,0 +1,151 @@
+"""In-process pub/sub behind the live feed (GET /posts/stream, Server-Sent Events).
+
+Routes publish small events (a new post, a verdict) once; each event is
+serialized into an SSE frame a single time and appended to every subscriber's
+bounded buffer. A subscriber whose buffer fills up is dropped rather than
+slowing publishers or growing without bound; its stream ends with a `reset`
+event telling the client to refetch GET /posts and reconnect. A short replay
+log lets clients that reconnect with Last-Event-ID pick up what they missed.
+Event ids carry a per-process boot id, so an id issued by another worker, or
+by this one before a restart, is recognized as unknown and answered with a
+`reset` instead of a wrong replay.
+
+All methods must be called on the event loop thread. Events only reach
+clients connected to the same worker process.
+"""
+import asyncio
+import uuid
+from collections import deque
+
+from executors import ServiceUnavailable
+from http_cache import dumps
+
+
+class LiveFeedFull(ServiceUnavailable):
+    """Raised when a worker already serves its maximum number of live feed connections."""
+
+    def __init__(self, limit, retry_after):
+        super().__init__(f"live feed already has {limit} subscribers, retry in {retry_after}s", retry_after)
+
+
+def sse_frame(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append("data: " + dumps(data).decode("utf-8"))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class Subscriber:
+    """One connected client: its pending frames and the event that wakes its stream."""
+
+    __slots__ = ("frames", "limit", "wakeup", "dropped")
+
+    def __init__(self, limit):
+        self.frames = deque()
+        self.limit = limit
+        self.wakeup = asyncio.Event()
+        self.dropped = False
+
+    def push(self, frame):
+        """Queues a frame; returns False (and marks the subscriber dropped) when the buffer is full."""
+        if len(self.frames) >= self.limit:
+            self.dropped = True
+            self.frames.clear()
+            self.wakeup.set()
+            return False
+        self.frames.append(frame)
+        self.wakeup.set()
+        return True
+
+    async def wait(self, timeout):
+        """Returns the frames queued so far, waiting up to `timeout` seconds for one (empty list on timeout)."""
+        if not self.frames and not self.dropped:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self.wakeup.clear()
+        frames = list(self.frames)
+        self.frames.clear()
+        return frames
+
+
+class FeedBroadcaster:
+    """Fans events out to subscribers with bounded buffers, dropping the ones that fall behind."""
+
+    def __init__(self, buffer_size=64, replay_size=1024, max_subscribers=5000, retry_after=5):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.retry_after = retry_after
+        self._subscribers = set()
+        self._replay = deque(maxlen=replay_size)  # (event number, frame)
+        self._boot_id = uuid.uuid4().hex[:12]
+        self._next_id = 1
+
+        self._published = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._resets = 0
+
+    def publish(self, event, data):
+        """Sends `data` as an `event` frame to every subscriber; returns the event id."""
+        number = self._next_id
+        self._next_id += 1
+        event_id = f"{self._boot_id}-{number}"
+        frame = sse_frame(event, data, event_id)
+        self._replay.append((number, frame))
+        self._published += 1
+        for subscriber in list(self._subscribers):
+            if subscriber.push(frame):
+                self._delivered += 1
+            else:
+                self._subscribers.discard(subscriber)
+                self._dropped += 1
+        return event_id
+
+    def _event_number(self, event_id):
+        """Returns the sequence number of an id this process issued, or None for any other id."""
+        boot_id, _, number = (event_id or "").partition("-")
+        if boot_id != self._boot_id:
+            return None
+        try:
+            number = int(number)
+        except ValueError:
+            return None
+        return number if 0 < number < self._next_id else None
+
+    def subscribe(self, last_event_id=None):
+        """Registers a subscriber, pre-filled with the replayable events after `last_event_id`.
+
+        If that id is older than the replay log, or was not issued by this
+        process, the subscriber starts with a `reset` frame instead, since
+        events in between were lost.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise LiveFeedFull(self.max_subscribers, self.retry_after)
+        subscriber = Subscriber(self.buffer_size)
+        if last_event_id is not None:
+            last = self._event_number(last_event_id)
+            missed = [(number, frame) for number, frame in self._replay if last is not None and number > last]
+            oldest = self._replay[0][0] if self._replay else self._next_id
+            if last is None or last < oldest - 1 or len(missed) > self.buffer_size:
+                self._resets += 1
+                subscriber.push(sse_frame("reset", {"reason": "missed events"}))
+            else:
+                for _, frame in missed:
+                    subscriber.push(frame)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self._published,
+            "delivered": self._delivered,
+            "dropped": self._dropped,
+            "resets": self._resets,
+            "events": self._next_id - 1,
+        }
@@ -0,0 +1,143 @@
+"""Request/stage latency histograms, Prometheus exposition and optional per-request trace logs.
+
+Wrap any step of a request in `metrics.span("stage")`: its duration goes into
+the `truepix_stage_seconds` histogram and, while a request is being traced,
+into that request's trace. The API middleware opens the trace and logs one
+line per request with the time spent in each stage. Thread-pool executors copy
+the caller's context, so spans inside I/O and inference pool jobs are
+attributed to the request that submitted them.
+
+Point-in-time state that components already report through `stats()` (queue
+depths, cache hits, executor backlogs) is exported by `register_stats` at
+scrape time rather than being counted twice.
+"""
+import contextlib
+import contextvars
+import time
+
+_trace = contextvars.ContextVar("request_trace", default=None)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def start_trace():
+    """Starts collecting (stage, seconds) spans for the current request; returns the list they go into."""
+    spans = []
+    _trace.set(spans)
+    return spans
+
+
+def format_trace(spans):
+    """Sums repeated stages, in first-seen order: "preprocess=3.1ms s3.upload=41.0ms"."""
+    totals = {}
+    for stage, seconds in spans:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return " ".join(f"{stage}={seconds * 1000.0:.1f}ms" for stage, seconds in totals.items())
+
+
+def _flatten(stats, prefix=""):
+    """Yields (name, labels, value) for the numeric leaves of a stats() dict; nested dict keys become a `key` label."""
+    for name, value in stats.items():
+        if isinstance(value, (int, float)):  # bools included
+            yield prefix + name, {}, float(value)
+        elif isinstance(value, dict):
+            for key, nested in value.items():
+                if isinstance(nested, dict):
+                    for field, leaf in nested.items():
+                        if isinstance(leaf, (int, float)):
+                            yield f"{prefix}{name}_{field}", {"key": str(key)}, float(leaf)
+                elif isinstance(nested, (int, float)):
+                    yield prefix + name, {"key": str(key)}, float(nested)
+
+
+class _StatsCollector:
+    """Exports a component's stats() dict as gauges each time /metrics is scraped."""
+
+    def __init__(self, namespace, name, stats_fn):
+        self.prefix = f"{namespace}_{name}_"
+        self.stats_fn = stats_fn
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        stats = self.stats_fn()
+        if not stats:
+            return
+        families = {}
+        for metric, labels, value in _flatten(stats, self.prefix):
+            family = families.get(metric)
+            if family is None:
+                family = families[metric] = GaugeMetricFamily(metric, metric, labels=sorted(labels))
+            family.add_metric([labels[label] for label in sorted(labels)], value)
+        yield from families.values()
+
+
+class Metrics:
+    """Prometheus histograms for routes, stages and inference batches, plus the trace spans.
+
+    With `enabled=False` spans still feed request traces but nothing is exported
+    and prometheus_client is not needed.
+    """
+
+    def __init__(self, enabled=True, namespace="truepix", buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.namespace = namespace
+        if not enabled:
+            return
+        try:
+            import prometheus_client
+        except ImportError:
+            raise RuntimeError("METRICS_ENABLED is set but the 'prometheus_client' package is not installed")
+        self._prometheus = prometheus_client
+        self.registry = prometheus_client.CollectorRegistry()
+        self._requests = prometheus_client.Histogram(
+            f"{namespace}_request_seconds", "HTTP request latency by route",
+            ["method", "route", "status"], buckets=buckets, registry=self.registry,
+        )
+        self._stages = prometheus_client.Histogram(
+            f"{namespace}_stage_seconds", "Time spent in one stage of a request or background job",
+            ["stage"], buckets=buckets, registry=self.registry,
+        )
+        self._batch_sizes = prometheus_client.Histogram(
+            f"{namespace}_inference_batch_size", "Images per forward pass (before padding)",
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128), registry=self.registry,
+        )
+        self._batch_waits = prometheus_client.Histogram(
+            f"{namespace}_inference_queue_wait_seconds", "Time the oldest image of a batch waited to be flushed",
+            buckets=buckets, registry=self.registry,
+        )
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage, seconds):
+        spans = _trace.get()
+        if spans is not None:
+            spans.append((stage, seconds))
+        if self.enabled:
+            self._stages.labels(stage).observe(seconds)
+
+    def observe_request(self, method, route, status, seconds):
+        if self.enabled:
+            self._requests.labels(method, route, str(status)).observe(seconds)
+
+    def observe_batch(self, count, queue_wait, seconds):
+        """BatchPredictor `on_batch` hook: one forward pass of `count` images."""
+        if self.enabled:
+            self._batch_sizes.observe(count)
+            self._batch_waits.observe(queue_wait)
+            self._stages.labels("model.predict").observe(seconds)
+
+    def register_stats(self, name, stats_fn):
+        """Exports `stats_fn()` (a component's stats dict, or None) as `<namespace>_<name>_*` gauges."""
+        if self.enabled:
+            self.registry.register(_StatsCollector(self.namespace, name, stats_fn))
+
+    def render(self):
+        """Returns (body, content type) for the /metrics endpoint."""
+        return self._prometheus.generate_latest(self.registry), self._prometheus.CONTENT_TYPE_LATEST
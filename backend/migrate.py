@@ -0,0 +1,247 @@
+"""Schema migrations and backfills for the DynamoDB tables.
+
+Usage (from the backend directory):
+
+    python migrate.py create-tables --endpoint-url http://localhost:8001   # local stand-in only
+    python migrate.py add-indexes
+    python migrate.py backfill-feed
+    python migrate.py find-duplicate-usernames
+    python migrate.py reconcile-stats
+    python migrate.py backfill-registration-keys
+"""
+import argparse
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+from config import (
+    AWS_ACCESS_KEY,
+    AWS_SECRET_KEY,
+    S3_REGION_NAME,
+    DYNAMODB_TABLE_VALID_DATA,
+    DYNAMODB_TABLE_FAKE_DATA,
+    DYNAMODB_TABLE_POSTS,
+    DYNAMODB_TABLE_VERDICTS,
+    DYNAMODB_TABLE_USER_STATS,
+    DYNAMODB_TABLE_REGISTRATION_KEYS,
+    POSTS_FEED_INDEX,
+    REGISTRATIONS_USERNAME_INDEX,
+    FEED_PARTITION,
+)
+from registrations import DuplicateAccount, claim_account
+from user_stats import compute_stats, write_stats
+
+
+# Global secondary indexes each table needs: (index name, hash key, range key or None)
+TABLE_INDEXES = {
+    DYNAMODB_TABLE_VALID_DATA: [
+        (REGISTRATIONS_USERNAME_INDEX, "username", None),
+    ],
+    DYNAMODB_TABLE_FAKE_DATA: [],
+    DYNAMODB_TABLE_POSTS: [
+        (POSTS_FEED_INDEX, "feed", "timestamp"),
+    ],
+    DYNAMODB_TABLE_VERDICTS: [],
+    DYNAMODB_TABLE_USER_STATS: [],
+    DYNAMODB_TABLE_REGISTRATION_KEYS: [],
+}
+
+# Partition key of each table (tables not listed use "id")
+TABLE_HASH_KEYS = {
+    DYNAMODB_TABLE_VERDICTS: "key",
+    DYNAMODB_TABLE_USER_STATS: "user_id",
+    DYNAMODB_TABLE_REGISTRATION_KEYS: "key",
+}
+
+
+def get_dynamodb(endpoint_url=None):
+    return boto3.resource(
+        "dynamodb",
+        aws_access_key_id=AWS_ACCESS_KEY or None,
+        aws_secret_access_key=AWS_SECRET_KEY or None,
+        region_name=S3_REGION_NAME,
+        endpoint_url=endpoint_url,
+    )
+
+
+def _key_schema(hash_key, range_key=None):
+    schema = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+    if range_key:
+        schema.append({"AttributeName": range_key, "KeyType": "RANGE"})
+    return schema
+
+
+def _index_spec(name, hash_key, range_key):
+    return {
+        "IndexName": name,
+        "KeySchema": _key_schema(hash_key, range_key),
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def _attribute_definitions(names):
+    return [{"AttributeName": name, "AttributeType": "S"} for name in sorted(set(names))]
+
+
+def create_tables(dynamodb):
+    """Creates every table with its indexes (for local stand-ins and fresh environments)."""
+    existing = {table.name for table in dynamodb.tables.all()}
+    for table_name, indexes in TABLE_INDEXES.items():
+        if table_name in existing:
+            print(f"{table_name}: exists")
+            continue
+        hash_key = TABLE_HASH_KEYS.get(table_name, "id")
+        kwargs = {
+            "TableName": table_name,
+            "KeySchema": _key_schema(hash_key),
+            "BillingMode": "PAY_PER_REQUEST",
+        }
+        attributes = [hash_key]
+        if indexes:
+            kwargs["GlobalSecondaryIndexes"] = [_index_spec(*index) for index in indexes]
+            for _, index_hash_key, index_range_key in indexes:
+                attributes.extend(key for key in (index_hash_key, index_range_key) if key)
+        kwargs["AttributeDefinitions"] = _attribute_definitions(attributes)
+        dynamodb.create_table(**kwargs).wait_until_exists()
+        print(f"{table_name}: created")
+
+
+def add_indexes(dynamodb, poll_seconds=10):
+    """Adds any missing GSIs to existing tables, one at a time (DynamoDB allows one per update)."""
+    for table_name, indexes in TABLE_INDEXES.items():
+        table = dynamodb.Table(table_name)
+        for name, hash_key, range_key in indexes:
+            table.reload()
+            present = {index["IndexName"] for index in table.global_secondary_indexes or []}
+            if name in present:
+                print(f"{table_name}.{name}: exists")
+                continue
+            table.update(
+                AttributeDefinitions=_attribute_definitions(key for key in (hash_key, range_key) if key),
+                GlobalSecondaryIndexUpdates=[{"Create": _index_spec(name, hash_key, range_key)}],
+            )
+            print(f"{table_name}.{name}: creating", end="", flush=True)
+            while True:
+                table.reload()
+                statuses = {index["IndexName"]: index.get("IndexStatus") for index in table.global_secondary_indexes or []}
+                if statuses.get(name) == "ACTIVE":
+                    break
+                print(".", end="", flush=True)
+                time.sleep(poll_seconds)
+            print(" active")
+
+
+def scan_all(table, **kwargs):
+    """Yields every item of a table, following LastEvaluatedKey across scan pages."""
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get("Items", [])
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def backfill_feed(dynamodb):
+    """Tags existing posts with the feed partition so they appear in the feed index.
+
+    Also gives posts without a timestamp the epoch default, since items missing an
+    index's range key are left out of the feed.
+    """
+    table = dynamodb.Table(DYNAMODB_TABLE_POSTS)
+    updated = skipped = 0
+    for post in scan_all(table, ProjectionExpression="id, feed, #ts", ExpressionAttributeNames={"#ts": "timestamp"}):
+        if post.get("feed") == FEED_PARTITION and post.get("timestamp"):
+            skipped += 1
+            continue
+        try:
+            table.update_item(
+                Key={"id": post["id"]},
+                UpdateExpression="SET feed = :feed, #ts = if_not_exists(#ts, :epoch)",
+                ConditionExpression="attribute_exists(id)",
+                ExpressionAttributeNames={"#ts": "timestamp"},
+                ExpressionAttributeValues={":feed": FEED_PARTITION, ":epoch": "1970-01-01T00:00:00"},
+            )
+            updated += 1
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+    print(f"posts: {updated} updated, {skipped} already tagged")
+
+
+def find_duplicate_usernames(dynamodb):
+    """Lists usernames shared by several registrations; login only matches one of them."""
+    table = dynamodb.Table(DYNAMODB_TABLE_VALID_DATA)
+    ids_by_username = {}
+    for user in scan_all(table, ProjectionExpression="id, username"):
+        ids_by_username.setdefault(user.get("username"), []).append(user["id"])
+    duplicates = {username: ids for username, ids in ids_by_username.items() if len(ids) > 1}
+    for username, ids in sorted(duplicates.items(), key=lambda item: str(item[0])):
+        print(f"{username}: {', '.join(ids)}")
+    print(f"{len(duplicates)} duplicated usernames")
+
+
+def reconcile_stats(dynamodb):
+    """Recomputes every user's real/fake counters from the posts table to repair drift.
+
+    Posts created while this runs may be counted twice or not at all; run it when
+    traffic is low, or run it again afterwards.
+    """
+    posts = scan_all(
+        dynamodb.Table(DYNAMODB_TABLE_POSTS),
+        ProjectionExpression="user_id, #status, #ts",
+        ExpressionAttributeNames={"#status": "status", "#ts": "timestamp"},
+    )
+    stats = compute_stats(posts)
+    stats_table = dynamodb.Table(DYNAMODB_TABLE_USER_STATS)
+    existing = [item["user_id"] for item in scan_all(stats_table, ProjectionExpression="user_id")]
+    write_stats(stats_table, stats, stale_user_ids=existing)
+    print(f"user_stats: {len(stats)} users recomputed, {len(set(existing) - set(stats))} reset to zero")
+
+
+def backfill_registration_keys(dynamodb):
+    """Claims the username and email of every existing registration, oldest first.
+
+    Registrations whose username or email is already claimed by an earlier one are
+    listed; they keep working for login but block nobody else's signup.
+    """
+    users = scan_all(
+        dynamodb.Table(DYNAMODB_TABLE_VALID_DATA),
+        ProjectionExpression="id, username, email, #ts",
+        ExpressionAttributeNames={"#ts": "timestamp"},
+    )
+    keys_table = dynamodb.Table(DYNAMODB_TABLE_REGISTRATION_KEYS)
+    claimed = conflicts = 0
+    for user in sorted(users, key=lambda user: user.get("timestamp") or ""):
+        if not user.get("username") or not user.get("email"):
+            continue
+        try:
+            claim_account(keys_table, user["id"], user["username"], user["email"])
+            claimed += 1
+        except DuplicateAccount as e:
+            conflicts += 1
+            print(f"{user['id']}: {e}")
+    print(f"registration_keys: {claimed} registrations claimed, {conflicts} conflicts")
+
+
+COMMANDS = {
+    "create-tables": create_tables,
+    "add-indexes": add_indexes,
+    "backfill-feed": backfill_feed,
+    "find-duplicate-usernames": find_duplicate_usernames,
+    "reconcile-stats": reconcile_stats,
+    "backfill-registration-keys": backfill_registration_keys,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint (e.g. a local DynamoDB or moto server)")
+    args = parser.parse_args(argv)
+    COMMANDS[args.command](get_dynamodb(args.endpoint_url))
+
+
+if __name__ == "__main__":
+    main()
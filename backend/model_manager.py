@@ -0,0 +1,113 @@
+import importlib
+import threading
+import time
+
+import numpy as np
+
+from executors import ServiceUnavailable
+from verdict_cache import file_version
+
+
+class ModelNotReady(ServiceUnavailable):
+    """Raised when a prediction is requested before the model has loaded and warmed up."""
+
+    def __init__(self, state, retry_after):
+        super().__init__(f"model is not ready ({state}), retry in {retry_after}s", retry_after)
+        self.state = state
+
+
+class ModelManager:
+    """Loads the model on a background thread so the API can serve other routes immediately.
+
+    Lifecycle: pending -> fingerprint -> import -> load -> warmup -> ready (or failed).
+    Warm-up runs one forward pass per batch size the batch predictor can emit, so
+    graph tracing happens before the first real request rather than during it.
+    """
+
+    def __init__(self, path, load_fn, predict_fn, warmup_batch_sizes, input_shape,
+                 preload_modules=(), on_version=None, retry_after=5, version_fn=file_version):
+        self.path = path
+        self.load_fn = load_fn
+        self.predict_fn = predict_fn
+        self.warmup_batch_sizes = list(warmup_batch_sizes)
+        self.input_shape = tuple(input_shape)
+        self.preload_modules = list(preload_modules)
+        self.on_version = on_version
+        self.version_fn = version_fn
+        self.retry_after = retry_after
+
+        self.state = "pending"
+        self.error = None
+        self.version = None
+        self.timings = {}
+        self._model = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """Starts loading in the background (no-op if already started)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """Blocks until the model is ready; returns False on timeout or failure."""
+        self._ready.wait(timeout)
+        return self.ready
+
+    def check_ready(self):
+        if not self.ready:
+            raise ModelNotReady(self.state, self.retry_after)
+
+    def predict(self, batch):
+        """Runs one forward pass; raises ModelNotReady until loading and warm-up finish."""
+        self.check_ready()
+        return self.predict_fn(self._model, batch)
+
+    def status(self):
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "path": self.path,
+            "model_version": self.version,
+            "error": self.error,
+            "timings_ms": dict(self.timings),
+        }
+
+    def _phase(self, name, fn):
+        self.state = name
+        started = time.perf_counter()
+        result = fn()
+        self.timings[f"{name}_ms"] = (time.perf_counter() - started) * 1000.0
+        return result
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            self.version = self._phase("fingerprint", lambda: self.version_fn(self.path))
+            if self.on_version is not None:
+                self.on_version(self.version)
+            self._phase("import", lambda: [importlib.import_module(name) for name in self.preload_modules])
+            self._model = self._phase("load", lambda: self.load_fn(self.path))
+            self._phase("warmup", self._warm_up)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = "failed"
+            return
+        self.timings["cold_start_ms"] = (time.perf_counter() - started) * 1000.0
+        self.state = "ready"
+        self._ready.set()
+
+    def _warm_up(self):
+        for size in self.warmup_batch_sizes:
+            batch = np.zeros((size,) + self.input_shape, dtype=np.float32)
+            started = time.perf_counter()
+            self.predict_fn(self._model, batch)
+            self.timings[f"warmup_batch_{size}_ms"] = (time.perf_counter() - started) * 1000.0
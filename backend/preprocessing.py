@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from verdict_cache import cache_keys
+
+
+INPUT_SIZE = (150, 150)  # XceptionNet input width/height
+INPUT_SHAPE = (INPUT_SIZE[1], INPUT_SIZE[0], 3)
+
+
+def open_for_model(source, size=INPUT_SIZE):
+    """Opens an image (bytes, file object or PIL image) and decodes it as RGB at reduced size where possible.
+
+    For JPEGs, draft mode lets libjpeg decode straight to the smallest 1/2, 1/4 or
+    1/8 scale that is still at least `size`, so a 12MP photo is never fully decoded
+    just to be shrunk to 150x150.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    image = source if isinstance(source, Image.Image) else Image.open(source)
+    if image.format == "JPEG":
+        image.draft("RGB", size)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
+
+
+def resize_for_model(image, size=INPUT_SIZE):
+    """Resizes a decoded RGB image once and returns it as an HxWx3 uint8 array."""
+    if image.size != size:
+        image = image.resize(size)
+    return np.asarray(image, dtype=np.uint8)
+
+
+def normalize_into(pixels, out):
+    """Applies Xception normalization (x / 127.5 - 1) to uint8 pixels, writing float32 into `out` in place."""
+    np.divide(pixels, 127.5, out=out, casting="unsafe")
+    out -= 1.0
+    return out
+
+
+def fill_model_input(pixels, out):
+    """Writes one queued image into a batch row: uint8 pixels are normalized, float input is copied as-is."""
+    if pixels.dtype == np.uint8:
+        return normalize_into(pixels, out)
+    np.copyto(out, pixels, casting="unsafe")
+    return out
+
+
+def preprocess_into(image, out):
+    """Decodes, resizes and normalizes one image directly into `out` (e.g. a row of a preallocated batch)."""
+    return normalize_into(resize_for_model(open_for_model(image)), out)
+
+
+def preprocess_image(image):
+    """Preprocesses an image for XceptionNet."""
+    out = np.empty((1,) + INPUT_SHAPE, dtype=np.float32)
+    preprocess_into(image, out[0])
+    return out
+
+
+def prepare_upload(data, cache=None, perceptual=False):
+    """Decodes upload bytes and returns (cache_keys, cached_score, pixels).
+
+    `pixels` is the resized HxWx3 uint8 image; normalization to float32 happens when
+    it is copied into the batch buffer. When a verdict cache is given and already
+    holds a score for the decoded pixels, resizing is skipped and pixels is None.
+    Process-pool workers are called without a cache and always resize.
+    """
+    image = open_for_model(data)
+    keys = cache_keys(image, perceptual=perceptual)
+    if cache is not None:
+        score = cache.get(keys)
+        if score is not None:
+            return keys, score, None
+    return keys, None, resize_for_model(image)
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = {}  # cached marker for ids that have no registration (e.g. deleted authors)
+
+
+class RedisProfileStore:
+    """Optional shared tier so workers and nodes reuse each other's profile lookups."""
+
+    def __init__(self, url, prefix="profile:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("PROFILE_CACHE_REDIS_URL is set but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get_many(self, user_ids):
+        values = self._client.mget([self._prefix + user_id for user_id in user_ids])
+        return {
+            user_id: json.loads(value)
+            for user_id, value in zip(user_ids, values)
+            if value is not None
+        }
+
+    def set_many(self, users, ttl_seconds):
+        pipeline = self._client.pipeline(transaction=False)
+        for user_id, user in users.items():
+            pipeline.set(self._prefix + user_id, json.dumps(user), ex=max(1, int(ttl_seconds)))
+        pipeline.execute()
+
+    def delete(self, user_id):
+        self._client.delete(self._prefix + user_id)
+
+
+class ProfileCache:
+    """In-process TTL + LRU cache of author profiles used to join posts with their authors.
+
+    Misses are resolved in one call to `loader(user_ids) -> {id: profile}` (a
+    BatchGetItem), optionally through a shared store first. Ids the loader does
+    not return are cached as missing too, so posts by deleted users do not cause
+    repeated lookups. Entries are served for at most `ttl_seconds` (the staleness
+    window) unless invalidated earlier.
+    """
+
+    def __init__(self, loader, max_entries=5000, ttl_seconds=300, shared_store=None):
+        self.loader = loader
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared_store = shared_store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._loads = 0
+
+    def get_many(self, user_ids):
+        """Returns {id: profile} for every id that has a registration."""
+        found = {}
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for user_id in dict.fromkeys(user_id for user_id in user_ids if user_id):
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(user_id)
+                    self._hits += 1
+                    if entry[0] is not _MISSING:
+                        found[user_id] = entry[0]
+                    continue
+                if entry is not None:
+                    del self._entries[user_id]
+                    self._expired += 1
+                missing.append(user_id)
+
+        if not missing:
+            return found
+
+        loaded = {}
+        if self.shared_store is not None:
+            loaded = self.shared_store.get_many(missing)
+            with self._lock:
+                self._shared_hits += len(loaded)
+            missing = [user_id for user_id in missing if user_id not in loaded]
+
+        if missing:
+            fresh = self.loader(missing)
+            with self._lock:
+                self._loads += 1
+                self._misses += len(missing)
+            if self.shared_store is not None and fresh:
+                self.shared_store.set_many(fresh, self.ttl_seconds)
+            loaded.update(fresh)
+
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for user_id in missing:
+                self._store(user_id, loaded.get(user_id, _MISSING), expires)
+            for user_id, user in loaded.items():
+                if user_id not in self._entries:
+                    self._store(user_id, user, expires)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, user_id):
+        """Drops a profile after a registration or profile change so the next read reloads it."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self.shared_store is not None:
+            self.shared_store.delete(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self._hits + self._shared_hits
+            total = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "shared_hits": self._shared_hits,
+                "misses": self._misses,
+                "hit_ratio": (hits / total) if total else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "batch_loads": self._loads,
+            }
+
+    def _store(self, user_id, user, expires):
+        self._entries[user_id] = (user, expires)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
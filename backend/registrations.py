@@ -0,0 +1,60 @@
+from botocore.exceptions import ClientError
+
+
+class DuplicateAccount(Exception):
+    """Raised when a username or email is already claimed by another registration."""
+
+    def __init__(self, field, value):
+        super().__init__(f"{field.capitalize()} {value!r} is already registered")
+        self.field = field
+        self.value = value
+
+
+def unique_keys(username, email):
+    """Claim keys that must be unique across registrations; emails compare case-insensitively."""
+    return [("username", username, f"username#{username}"), ("email", email, f"email#{email.strip().lower()}")]
+
+
+def claim_account(keys_table, user_id, username, email):
+    """Reserves a username and email for `user_id` with conditional puts (one item per key).
+
+    A key already held by another user raises DuplicateAccount and any key claimed
+    so far is released again. Re-claiming keys the same user already holds
+    succeeds, so a retried import is idempotent.
+    """
+    claimed = []
+    try:
+        for field, value, key in unique_keys(username, email):
+            try:
+                keys_table.put_item(
+                    Item={"key": key, "user_id": user_id},
+                    ConditionExpression="attribute_not_exists(#key) OR user_id = :user_id",
+                    ExpressionAttributeNames={"#key": "key"},
+                    ExpressionAttributeValues={":user_id": user_id},
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                    raise DuplicateAccount(field, value)
+                raise
+            claimed.append(key)
+    except Exception:
+        release_keys(keys_table, user_id, claimed)
+        raise
+
+
+def release_account(keys_table, user_id, username, email):
+    """Frees the keys claimed for a registration that could not be stored."""
+    release_keys(keys_table, user_id, [key for _, _, key in unique_keys(username, email)])
+
+
+def release_keys(keys_table, user_id, keys):
+    for key in keys:
+        try:
+            keys_table.delete_item(
+                Key={"key": key},
+                ConditionExpression="user_id = :user_id",
+                ExpressionAttributeValues={":user_id": user_id},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
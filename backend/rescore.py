@@ -0,0 +1,281 @@
+"""Re-scores the images of existing posts and profiles with the current model.
+
+Usage (from the backend directory):
+
+    python rescore.py posts registrations --segments 4 --download-workers 16
+    python rescore.py posts --apply-status    # also overwrite post verdicts, then run `migrate.py reconcile-stats`
+    python rescore.py posts --endpoint-url http://localhost:8001 --s3-endpoint-url http://localhost:9000
+
+Each table is read with --segments parallel scan segments. Images of a scanned
+page are downloaded and decoded on a shared thread pool, scored in batches of
+--batch-size with INFERENCE_BACKEND, and written back with batch_writer as
+`score`, `model_version` and `rescored_at` (posts keep their upload-time `status`
+unless --apply-status is given). Items already scored by the current model
+version and posts still pending verification are skipped.
+
+Progress is checkpointed per segment to --checkpoint after every written page,
+so an interrupted run resumes where it stopped (--restart ignores the file).
+Items are rewritten whole; like reconcile-stats, run it when traffic is low.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from config import (
+    AWS_ACCESS_KEY,
+    AWS_SECRET_KEY,
+    S3_BUCKET_NAME,
+    S3_BUCKET_NAME_POSTS,
+    S3_REGION_NAME,
+    DYNAMODB_TABLE_VALID_DATA,
+    DYNAMODB_TABLE_POSTS,
+    INFERENCE_BACKEND,
+    INFERENCE_MODEL_PATHS,
+    INFERENCE_THREADS,
+    BATCH_MAX_SIZE,
+    AWS_RETRY_MODE,
+    AWS_MAX_ATTEMPTS,
+    AWS_CONNECT_TIMEOUT,
+    AWS_READ_TIMEOUT,
+)
+from aws_clients import make_client, make_client_config, make_resource, make_session
+from inference_backends import backend_version, load_backend
+from preprocessing import INPUT_SHAPE, normalize_into, open_for_model, resize_for_model
+from storage import download_original, key_from_url
+from verification import PENDING
+
+logger = logging.getLogger(__name__)
+
+
+# Rescorable tables: name -> (DynamoDB table, S3 bucket of the images, attribute holding the image URL)
+TABLES = {
+    "posts": (DYNAMODB_TABLE_POSTS, S3_BUCKET_NAME_POSTS, "image_url"),
+    "registrations": (DYNAMODB_TABLE_VALID_DATA, S3_BUCKET_NAME, "profile_image_url"),
+}
+
+
+class Checkpoint:
+    """Per-segment scan positions of one run, persisted as JSON after every written page."""
+
+    def __init__(self, path, model_version, total_segments, restart=False):
+        self.path = path
+        self._lock = threading.Lock()
+        state = None
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state.get("model_version") != model_version or state.get("total_segments") != total_segments:
+                raise SystemExit(
+                    f"{path} was written for model {state.get('model_version')} with "
+                    f"{state.get('total_segments')} segments; pass --restart to discard it"
+                )
+        self._state = state or {"model_version": model_version, "total_segments": total_segments, "tables": {}}
+
+    def get(self, table, segment):
+        """Returns (start_key, done) for a segment; a fresh segment starts at (None, False)."""
+        with self._lock:
+            entry = self._state["tables"].get(table, {}).get(str(segment), {})
+        return entry.get("last_key"), entry.get("done", False)
+
+    def save(self, table, segment, last_key):
+        with self._lock:
+            self._state["tables"].setdefault(table, {})[str(segment)] = {"last_key": last_key, "done": last_key is None}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.path)
+
+
+class Progress:
+    """Thread-safe counters with a periodic throughput line."""
+
+    FIELDS = ("scanned", "scored", "skipped", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._started = time.monotonic()
+
+    def add(self, table, **counts):
+        with self._lock:
+            entry = self._counts.setdefault(table, dict.fromkeys(self.FIELDS, 0))
+            for field, count in counts.items():
+                entry[field] += count
+
+    def report(self):
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        with self._lock:
+            counts = {table: dict(entry) for table, entry in self._counts.items()}
+        for table, entry in sorted(counts.items()):
+            print(
+                f"{table}: {entry['scanned']} scanned, {entry['scored']} scored "
+                f"({entry['scored'] / elapsed:.1f}/s), {entry['skipped']} skipped, {entry['failed']} failed",
+                flush=True,
+            )
+
+
+def client_config(max_pool_connections):
+    return make_client_config(max_pool_connections, AWS_RETRY_MODE, AWS_MAX_ATTEMPTS, AWS_CONNECT_TIMEOUT, AWS_READ_TIMEOUT)
+
+
+def scan_segment(table, segment, total_segments, start_key=None):
+    """Yields (items, last_key) for each scan page of one parallel-scan segment; last_key is None at the end."""
+    kwargs = {"Segment": segment, "TotalSegments": total_segments}
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    while True:
+        response = table.scan(**kwargs)
+        last_key = response.get("LastEvaluatedKey")
+        yield response.get("Items", []), last_key
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def load_pixels(s3_client, bucket_name, key):
+    """Downloads one image and returns it resized to the model input as uint8 pixels."""
+    with download_original(s3_client, bucket_name, key) as image:
+        return resize_for_model(open_for_model(image))
+
+
+class Rescorer:
+    """Scores scanned items in batches and writes the results back; shared by all segment threads."""
+
+    def __init__(self, backend, model_version, s3_client, download_pool, progress, checkpoint,
+                 batch_size=BATCH_MAX_SIZE, apply_status=False, force=False):
+        self.backend = backend
+        self.model_version = model_version
+        self.s3_client = s3_client
+        self.download_pool = download_pool
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.apply_status = apply_status
+        self.force = force
+        # The model runs one batch at a time; downloads of other segments keep going meanwhile
+        self._predict_lock = threading.Lock()
+
+    def needs_score(self, name, item):
+        if name == "posts" and item.get("status") == PENDING:
+            return False  # the verification queue will score it
+        return self.force or item.get("model_version") != self.model_version
+
+    def score_page(self, name, bucket_name, url_attribute, items):
+        """Returns [(item, score)] for the page's items that could be loaded and scored."""
+        candidates = []
+        for item in items:
+            key = key_from_url(item.get(url_attribute), bucket_name, S3_REGION_NAME)
+            if key and self.needs_score(name, item):
+                candidates.append((item, key))
+        self.progress.add(name, scanned=len(items), skipped=len(items) - len(candidates))
+
+        futures = [self.download_pool.submit(load_pixels, self.s3_client, bucket_name, key) for _, key in candidates]
+        loaded = []
+        for (item, key), future in zip(candidates, futures):
+            try:
+                loaded.append((item, future.result()))
+            except Exception as e:
+                logger.warning("%s %s: could not load %s: %s", name, item.get("id"), key, e)
+                self.progress.add(name, failed=1)
+
+        scored = []
+        batch = np.empty((self.batch_size,) + INPUT_SHAPE, dtype=np.float32)
+        for start in range(0, len(loaded), self.batch_size):
+            chunk = loaded[start:start + self.batch_size]
+            for row, (_, pixels) in enumerate(chunk):
+                normalize_into(pixels, batch[row])
+            with self._predict_lock:
+                scores = self.backend.predict(batch[:len(chunk)])[:, 0]
+            scored.extend((item, float(score)) for (item, _), score in zip(chunk, scores))
+        return scored
+
+    def write_back(self, table, name, scored):
+        now = datetime.utcnow().isoformat()
+        with table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
+            for item, score in scored:
+                item = dict(item, score=Decimal(str(round(score, 6))), model_version=self.model_version, rescored_at=now)
+                if name == "posts" and self.apply_status:
+                    item["status"] = score <= 0.5
+                batch.put_item(Item=item)
+        self.progress.add(name, scored=len(scored))
+
+    def run_segment(self, name, segment, total_segments, endpoint_url=None):
+        table_name, bucket_name, url_attribute = TABLES[name]
+        start_key, done = self.checkpoint.get(name, segment)
+        if done:
+            return
+        # boto3 resources are not thread-safe, so each segment gets its own
+        session = make_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_REGION_NAME)
+        table = make_resource(session, "dynamodb", client_config(10), endpoint_url=endpoint_url).Table(table_name)
+        for items, last_key in scan_segment(table, segment, total_segments, start_key):
+            scored = self.score_page(name, bucket_name, url_attribute, items)
+            if scored:
+                self.write_back(table, name, scored)
+            self.checkpoint.save(name, segment, last_key)
+
+
+def report_every(progress, interval, stopped):
+    while not stopped.wait(interval):
+        progress.report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tables", nargs="+", choices=sorted(TABLES))
+    parser.add_argument("--segments", type=int, default=4, help="parallel scan segments per table")
+    parser.add_argument("--download-workers", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=BATCH_MAX_SIZE)
+    parser.add_argument("--apply-status", action="store_true", help="overwrite post status with the new verdict")
+    parser.add_argument("--force", action="store_true", help="also rescore items already scored by this model")
+    parser.add_argument("--checkpoint", default="rescore_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--report-seconds", type=float, default=10.0)
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint (e.g. a local DynamoDB or moto server)")
+    parser.add_argument("--s3-endpoint-url", help="S3 endpoint (e.g. MinIO or a moto server)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(levelname)s %(message)s")
+
+    model_path = INFERENCE_MODEL_PATHS[INFERENCE_BACKEND]
+    model_version = backend_version(INFERENCE_BACKEND, model_path)
+    backend = load_backend(INFERENCE_BACKEND, model_path, num_threads=INFERENCE_THREADS)
+    checkpoint = Checkpoint(args.checkpoint, model_version, args.segments, restart=args.restart)
+    progress = Progress()
+    s3_client = make_client(
+        make_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_REGION_NAME),
+        "s3",
+        client_config(args.download_workers),
+        endpoint_url=args.s3_endpoint_url,
+    )
+
+    stopped = threading.Event()
+    threading.Thread(target=report_every, args=(progress, args.report_seconds, stopped), daemon=True).start()
+    with ThreadPoolExecutor(args.download_workers, thread_name_prefix="download") as download_pool:
+        rescorer = Rescorer(
+            backend, model_version, s3_client, download_pool, progress, checkpoint,
+            batch_size=args.batch_size, apply_status=args.apply_status, force=args.force,
+        )
+        segments = [(name, segment) for name in args.tables for segment in range(args.segments)]
+        with ThreadPoolExecutor(len(segments), thread_name_prefix="segment") as segment_pool:
+            futures = [
+                segment_pool.submit(rescorer.run_segment, name, segment, args.segments, args.endpoint_url)
+                for name, segment in segments
+            ]
+            for future in futures:
+                future.result()
+    stopped.set()
+    progress.report()
+    print(f"model version {model_version}; checkpoint {args.checkpoint}")
+    if args.apply_status and "posts" in args.tables:
+        print("post verdicts changed: run `python migrate.py reconcile-stats` to refresh user counters")
+
+
+if __name__ == "__main__":
+    main()
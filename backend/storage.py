@@ -0,0 +1,188 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from boto3.s3.transfer import TransferConfig
+from PIL import Image, ImageOps
+
+
+CHUNK_SIZE = 1 << 20
+SPOOL_MAX_MEMORY = 8 << 20
+
+# File extensions for derivative formats
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+
+
+def file_size(file):
+    """Returns the size of a seekable file object without reading it."""
+    position = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+def sha256_file(file):
+    """Streams a file object through SHA-256 in fixed-size chunks and rewinds it."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest
+
+
+def detect_content_type(file, fallback="application/octet-stream"):
+    """Sniffs the image format from the file header (no full decode) and rewinds the file."""
+    file.seek(0)
+    try:
+        image_format = Image.open(file).format
+    except Exception:
+        image_format = None
+    finally:
+        file.seek(0)
+    return Image.MIME.get(image_format, fallback) if image_format else fallback
+
+
+def check_image(source):
+    """Raises ValueError unless `source` (a file or bytes) starts with an image header PIL can read.
+
+    Only the header is parsed, not the pixels; a file is rewound afterwards.
+    """
+    file = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    file.seek(0)
+    try:
+        Image.open(file)
+    except Exception:
+        raise ValueError("Uploaded file is not a supported image")
+    finally:
+        file.seek(0)
+
+
+def make_transfer_config(threshold, chunk_size, max_concurrency):
+    """Multipart settings: files above `threshold` bytes are sent in `chunk_size` parts."""
+    return TransferConfig(
+        multipart_threshold=threshold,
+        multipart_chunksize=chunk_size,
+        max_concurrency=max_concurrency,
+        use_threads=max_concurrency > 1,
+    )
+
+
+def upload_original(s3_client, file, bucket_name, key, content_type, transfer_config):
+    """Uploads the bytes exactly as received, streaming from the (spooled) file object.
+
+    boto3 switches to a multipart upload above the transfer config's threshold and
+    reads the file part by part, so nothing is buffered beyond one part per thread.
+    S3 verifies a SHA-256 checksum per part, and the whole-file digest is stored as
+    object metadata. Returns the hex digest.
+    """
+    digest = sha256_file(file)
+    s3_client.upload_fileobj(
+        file,
+        bucket_name,
+        key,
+        ExtraArgs={
+            "ContentType": content_type,
+            "ChecksumAlgorithm": "SHA256",
+            "Metadata": {"sha256": digest.hexdigest()},
+        },
+        Config=transfer_config,
+    )
+    return digest.hexdigest()
+
+
+def render_derivative(image, width, image_format="WEBP", quality=80, square=False):
+    """Returns (bytes, content_type) of a re-encode `width` pixels wide (never upscaled).
+
+    With `square`, the image is center-cropped to width x width first, which is
+    what the rounded avatar slots in the UI display anyway.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    if image_format == "JPEG" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    if square:
+        side = min(width, image.width, image.height)
+        image = ImageOps.fit(image, (side, side))
+    elif image.width > width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))))
+    output = io.BytesIO()
+    image.save(output, format=image_format, quality=quality)
+    return output.getvalue(), Image.MIME.get(image_format, "application/octet-stream")
+
+
+def derivative_key(key, label, image_format="WEBP"):
+    """S3 key for a derivative of `key`, e.g. uploads/a.jpg -> derivatives/480/uploads/a.jpg.webp.
+
+    The original extension is kept so a.jpg and a.png never share a derivative.
+    """
+    return f"derivatives/{label}/{key}{FORMAT_EXTENSIONS.get(image_format, '.' + image_format.lower())}"
+
+
+def download_original(s3_client, bucket_name, key):
+    """Reads an object back from S3 into a seekable temp file (spooled to disk if large); caller closes it."""
+    body = s3_client.get_object(Bucket=bucket_name, Key=key)["Body"]
+    original = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        shutil.copyfileobj(body, original, CHUNK_SIZE)
+    except Exception:
+        original.close()
+        raise
+    finally:
+        body.close()
+    original.seek(0)
+    return original
+
+
+def create_derivatives(s3_client, bucket_name, key, variants, image_format="WEBP", quality=80, square=False):
+    """Reads an original back from S3 once and stores one derivative per `variants` entry ({label: width}).
+
+    Runs after the request has finished, so it cannot rely on the upload's temp
+    file; the original is spooled to disk if large. Returns {label: derivative key}.
+    """
+    body = s3_client.get_object(Bucket=bucket_name, Key=key)["Body"]
+    keys = {}
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as original:
+            shutil.copyfileobj(body, original, CHUNK_SIZE)
+            original.seek(0)
+            image = Image.open(original)
+            if image.format == "JPEG":
+                # Decode at the smallest DCT scale that still covers the largest variant
+                largest = max(variants.values())
+                image.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            for label, width in variants.items():
+                data, content_type = render_derivative(image, width, image_format, quality, square)
+                target = derivative_key(key, label, image_format)
+                s3_client.put_object(Bucket=bucket_name, Key=target, Body=data, ContentType=content_type)
+                keys[label] = target
+    finally:
+        body.close()
+    return keys
+
+
+def public_url(bucket_name, key, region_name):
+    return f"https://{bucket_name}.s3.{region_name}.amazonaws.com/{key}"
+
+
+def key_from_url(url, bucket_name, region_name):
+    """Inverse of public_url for objects in `bucket_name`; returns None for any other URL."""
+    prefix = public_url(bucket_name, "", region_name)
+    if url and url.startswith(prefix):
+        return url[len(prefix):]
+    return None
+
+
+def pick_variant(variants, width):
+    """Returns the label of the smallest variant at least `width` wide, or None if none is wide enough."""
+    if not variants or not width:
+        return None
+    candidates = sorted((int(label), label) for label in variants if str(label).isdigit())
+    for size, label in candidates:
+        if size >= width:
+            return label
+    return None
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+
+COUNTER_FIELDS = ("real_images", "fake_images", "total_images")
+
+
+def record_post(table, user_id, status, timestamp):
+    """Atomically bumps a user's counters for one verified post (UpdateItem ADD)."""
+    table.update_item(
+        Key={"user_id": user_id},
+        UpdateExpression="ADD real_images :real, fake_images :fake, total_images :one SET last_post_at = :ts",
+        ExpressionAttributeValues={
+            ":real": 1 if status is True else 0,
+            ":fake": 1 if status is False else 0,
+            ":one": 1,
+            ":ts": timestamp,
+        },
+    )
+
+
+def get_stats(table, user_id):
+    """Reads a user's counters with a single GetItem; users without posts get zeros."""
+    item = table.get_item(Key={"user_id": user_id}).get("Item") or {}
+    stats = {field: int(item.get(field, 0)) for field in COUNTER_FIELDS}
+    stats["last_post_at"] = item.get("last_post_at")
+    return stats
+
+
+def compute_stats(posts):
+    """Recomputes counters from post items (used to repair drift); returns {user_id: stats}.
+
+    Posts still pending verification are skipped; they are counted when their verdict lands.
+    Unverifiable posts count towards total_images only, as record_post counts them.
+    """
+    stats = {}
+    for post in posts:
+        user_id = post.get("user_id")
+        if not user_id or post.get("status") == "pending":
+            continue
+        entry = stats.setdefault(user_id, {
+            "real_images": 0, "fake_images": 0, "total_images": 0, "last_post_at": None,
+        })
+        status = post.get("status")
+        if status is True:
+            entry["real_images"] += 1
+        elif status is False:
+            entry["fake_images"] += 1
+        entry["total_images"] += 1
+        timestamp = post.get("timestamp")
+        if timestamp and (entry["last_post_at"] is None or timestamp > entry["last_post_at"]):
+            entry["last_post_at"] = timestamp
+    return stats
+
+
+def write_stats(table, stats, stale_user_ids=()):
+    """Overwrites counter items with recomputed values; users in stale_user_ids are reset to zero."""
+    with table.batch_writer(overwrite_by_pkeys=["user_id"]) as batch:
+        for user_id in stale_user_ids:
+            if user_id not in stats:
+                batch.put_item(Item={"user_id": user_id, **{field: Decimal(0) for field in COUNTER_FIELDS}})
+        for user_id, entry in stats.items():
+            item = {"user_id": user_id, **{field: Decimal(entry[field]) for field in COUNTER_FIELDS}}
+            if entry["last_post_at"]:
+                item["last_post_at"] = entry["last_post_at"]
+            batch.put_item(Item=item)
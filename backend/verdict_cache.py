@@ -0,0 +1,230 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def content_hash(image):
+    """Hashes the decoded RGB pixels, so the same picture in different containers/metadata matches.
+
+    Rows are converted and hashed about HASH_BLOCK_BYTES at a time, so no second
+    full-size copy of the image is made; the digest equals hashing image.tobytes().
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{image.width}x{image.height}:".encode())
+    rows = max(1, HASH_BLOCK_BYTES // (3 * max(1, image.width)))
+    for top in range(0, image.height, rows):
+        block = image.crop((0, top, image.width, min(image.height, top + rows)))
+        if block.mode != "RGB":
+            block = block.convert("RGB")
+        digest.update(block.tobytes())
+    return "px:" + digest.hexdigest()
+
+
+def perceptual_hash(image, hash_size=8):
+    """64-bit difference hash (dHash); stable across re-encodes, resizes and mild recompression."""
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"dh:{value:0{hash_size * hash_size // 4}x}"
+
+
+def cache_keys(image, perceptual=False):
+    """Returns the cache keys for an image, most specific first."""
+    keys = [content_hash(image)]
+    if perceptual:
+        keys.append(perceptual_hash(image))
+    return keys
+
+
+def file_version(path):
+    """Fingerprints a model file so cached verdicts are tied to the exact weights that produced them."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SQLiteVerdictStore:
+    """Persistent verdict tier backed by a local SQLite file (shared by all workers on a node)."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, score REAL NOT NULL, model_version TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT score, model_version FROM verdicts WHERE key = ?", (key,)
+            ).fetchone()
+        return row
+
+    def put(self, key, score, model_version):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, score, model_version, created_at) VALUES (?, ?, ?, ?)",
+                (key, score, model_version, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DynamoDBVerdictStore:
+    """Persistent verdict tier backed by a DynamoDB table with a string partition key `key`."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def get(self, key):
+        item = self._table.get_item(Key={"key": key}).get("Item")
+        if not item:
+            return None
+        return float(item["score"]), item["model_version"]
+
+    def put(self, key, score, model_version):
+        # DynamoDB has no float type; store the score as a string to keep full precision
+        self._table.put_item(Item={
+            "key": key,
+            "score": repr(score),
+            "model_version": model_version,
+            "created_at": int(time.time()),
+        })
+
+    def close(self):
+        pass
+
+
+class VerdictCache:
+    """Two-tier (in-memory LRU + optional persistent store) cache of raw model scores.
+
+    Entries record the model version that produced them; an entry from any other
+    version is treated as a miss, so swapping the model invalidates the cache.
+    Until a version is set (e.g. while the model file is still being fingerprinted)
+    every lookup misses.
+    """
+
+    def __init__(self, model_version=None, max_entries=10000, store=None):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._memory_hits = 0
+        self._store_hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._lookups = 0
+        self._lookup_seconds = 0.0
+        self._max_lookup_seconds = 0.0
+
+    def get(self, keys):
+        """Returns the cached score for the first matching key, or None."""
+        started = time.perf_counter()
+        try:
+            return self._get(keys)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._lookups += 1
+                self._lookup_seconds += elapsed
+                self._max_lookup_seconds = max(self._max_lookup_seconds, elapsed)
+
+    def put(self, keys, score):
+        """Records a score under every key for the current model version."""
+        score = float(score)
+        if self.model_version is None:
+            return
+        with self._lock:
+            for key in keys:
+                self._entries[key] = (score, self.model_version)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.store is not None:
+            for key in keys:
+                self.store.put(key, score, self.model_version)
+
+    def set_model_version(self, model_version):
+        """Switches to a new model version; entries from older versions stop matching."""
+        with self._lock:
+            self.model_version = model_version
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self._memory_hits + self._store_hits
+            total = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "model_version": self.model_version,
+                "memory_hits": self._memory_hits,
+                "store_hits": self._store_hits,
+                "misses": self._misses,
+                "stale": self._stale,
+                "hit_rate": (hits / total) if total else 0.0,
+                "mean_lookup_ms": (self._lookup_seconds / self._lookups * 1000.0) if self._lookups else 0.0,
+                "max_lookup_ms": self._max_lookup_seconds * 1000.0,
+            }
+
+    def _get(self, keys):
+        with self._lock:
+            if self.model_version is None:
+                self._misses += 1
+                return None
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                score, version = entry
+                if version != self.model_version:
+                    del self._entries[key]
+                    self._stale += 1
+                    continue
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return score
+
+        if self.store is not None:
+            for key in keys:
+                row = self.store.get(key)
+                if row is None:
+                    continue
+                score, version = row
+                if version != self.model_version:
+                    with self._lock:
+                        self._stale += 1
+                    continue
+                with self._lock:
+                    self._entries[key] = (score, version)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                    self._store_hits += 1
+                return score
+
+        with self._lock:
+            self._misses += 1
+        return None
@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+
+from user_stats import record_post
+
+
+PENDING = "pending"
+UNVERIFIABLE = "failed"  # post status once its job ran out of attempts
+
+# Job states; a "running" job whose lease has expired (its worker died) is claimable again
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class VerificationQueue:
+    """Durable queue of post verification jobs in a local SQLite file.
+
+    Any number of threads and processes on the node (the API and
+    verification_worker.py) can share one file: claims take a write lock, so each
+    job is leased to a single worker at a time, and a job whose worker dies is
+    handed out again once its lease expires.
+    """
+
+    def __init__(self, path, lease_seconds=300, max_attempts=5):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit mode so claim() can open its own BEGIN IMMEDIATE transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, post_id TEXT NOT NULL UNIQUE, user_id TEXT NOT NULL, "
+                "bucket TEXT NOT NULL, s3_key TEXT NOT NULL, timestamp TEXT NOT NULL, state TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, available_at)")
+
+    def enqueue(self, post_id, user_id, bucket, s3_key, timestamp):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (post_id, user_id, bucket, s3_key, timestamp, state, available_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (post_id, user_id, bucket, s3_key, timestamp, QUEUED, now, now, now),
+            )
+
+    def claim(self, limit=1):
+        """Leases up to `limit` due jobs, oldest first; returns them as dicts."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE state IN (?, ?) AND available_at <= ? ORDER BY id LIMIT ?",
+                    (QUEUED, RUNNING, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1, available_at = ?, updated_at = ? WHERE id = ?",
+                    [(RUNNING, now + self.lease_seconds, now, row["id"]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [dict(row, attempts=row["attempts"] + 1) for row in rows]
+
+    def complete(self, job_id):
+        self._set(job_id, DONE, None, time.time())
+
+    def exhausted(self, job):
+        return job["attempts"] >= self.max_attempts
+
+    def retry(self, job, error):
+        """Requeues a failed job with exponential backoff, or marks it failed after max_attempts."""
+        if self.exhausted(job):
+            self._set(job["id"], FAILED, error, time.time())
+        else:
+            self._set(job["id"], QUEUED, error, time.time() + min(2 ** job["attempts"], 300))
+
+    def get(self, post_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, attempts, error, created_at, updated_at FROM jobs WHERE post_id = ?", (post_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def purge(self, older_than_seconds):
+        """Deletes finished jobs last updated more than `older_than_seconds` ago."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE state = ? AND updated_at < ?", (DONE, time.time() - older_than_seconds)
+            )
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _set(self, job_id, state, error, available_at):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, available_at = ?, updated_at = ? WHERE id = ?",
+                (state, error, available_at, time.time(), job_id),
+            )
+
+
+def apply_verdict(posts_table, user_stats_table, job, status):
+    """Writes a verdict onto a pending post and counts it in the author's stats.
+
+    The update only succeeds while the post is still pending, so a job retried
+    after a crash never counts the same post twice. Returns False if the post
+    was already verified (or deleted).
+    """
+    try:
+        posts_table.update_item(
+            Key={"id": job["post_id"]},
+            UpdateExpression="SET #status = :status, verified_at = :now",
+            ConditionExpression="#status = :pending",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={
+                ":status": status,
+                ":pending": PENDING,
+                ":now": datetime.utcnow().isoformat(),
+            },
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    record_post(user_stats_table, job["user_id"], status, job["timestamp"])
+    return True
+
+
+def retry_or_give_up(queue, posts_table, user_stats_table, job, error):
+    """Requeues a failed job; once it has used all its attempts, marks its post UNVERIFIABLE first.
+
+    The post is updated before the job is marked failed, so a crash in between
+    leaves a job that is claimed again rather than a post pending for good.
+    Returns True if this call marked the post unverifiable.
+    """
+    applied = False
+    if queue.exhausted(job):
+        applied = apply_verdict(posts_table, user_stats_table, job, UNVERIFIABLE)
+    queue.retry(job, error)
+    return applied
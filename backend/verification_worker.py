@@ -0,0 +1,154 @@
+"""Verifies posts accepted as "pending" (VERIFY_ASYNC) from the local job queue, outside the API.
+
+Usage (from the backend directory, on the same node as the API):
+
+    python verification_worker.py --processes 2 [--batch-size 16]
+
+Each process loads its own inference backend (INFERENCE_BACKEND; with "remote"
+they share the sidecar's model), claims up to --batch-size jobs at a time,
+scores them in one forward pass (with ROI_ENABLED, every job's full frame and
+face crops together), writes the verdicts onto the posts and bumps the
+authors' counters. Set VERIFICATION_CONSUMERS = 0 to leave all
+verification to these workers.
+"""
+import argparse
+import logging
+import multiprocessing
+import time
+
+import numpy as np
+
+from config import (
+    AWS_ACCESS_KEY,
+    AWS_SECRET_KEY,
+    S3_REGION_NAME,
+    DYNAMODB_TABLE_POSTS,
+    DYNAMODB_TABLE_USER_STATS,
+    INFERENCE_BACKEND,
+    INFERENCE_MODEL_PATHS,
+    INFERENCE_THREADS,
+    BATCH_MAX_SIZE,
+    AWS_RETRY_MODE,
+    AWS_MAX_ATTEMPTS,
+    AWS_CONNECT_TIMEOUT,
+    AWS_READ_TIMEOUT,
+    AWS_ENDPOINT_URLS,
+    VERIFICATION_QUEUE_PATH,
+    VERIFICATION_POLL_SECONDS,
+    VERIFICATION_LEASE_SECONDS,
+    VERIFICATION_MAX_ATTEMPTS,
+    ROI_ENABLED,
+    ROI_WORK_SIZE,
+    ROI_DETECT_SIZE,
+    ROI_MIN_FACE_PX,
+    ROI_MAX_REGIONS,
+    ROI_MARGIN,
+    ROI_INCLUDE_FULL_FRAME,
+    ROI_AGGREGATE,
+)
+from aws_clients import make_client, make_client_config, make_resource, make_session
+from inference_backends import load_backend
+from preprocessing import INPUT_SHAPE, normalize_into, preprocess_into
+from regions import FaceDetector, RegionExtractor, aggregate
+from storage import download_original
+from verification import VerificationQueue, apply_verdict, retry_or_give_up
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(batch_size):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    session = make_session(AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_REGION_NAME)
+    # Jobs are handled one at a time per process, so the default pool size is plenty
+    config = make_client_config(10, AWS_RETRY_MODE, AWS_MAX_ATTEMPTS, AWS_CONNECT_TIMEOUT, AWS_READ_TIMEOUT)
+    s3_client = make_client(session, "s3", config, endpoint_url=AWS_ENDPOINT_URLS["s3"])
+    dynamodb = make_resource(session, "dynamodb", config, endpoint_url=AWS_ENDPOINT_URLS["dynamodb"])
+    posts_table = dynamodb.Table(DYNAMODB_TABLE_POSTS)
+    user_stats_table = dynamodb.Table(DYNAMODB_TABLE_USER_STATS)
+    queue = VerificationQueue(VERIFICATION_QUEUE_PATH, VERIFICATION_LEASE_SECONDS, VERIFICATION_MAX_ATTEMPTS)
+    backend = load_backend(INFERENCE_BACKEND, INFERENCE_MODEL_PATHS[INFERENCE_BACKEND], num_threads=INFERENCE_THREADS)
+    extractor = RegionExtractor(
+        FaceDetector(min_size=ROI_MIN_FACE_PX),
+        work_size=ROI_WORK_SIZE,
+        detect_size=ROI_DETECT_SIZE,
+        max_regions=ROI_MAX_REGIONS,
+        margin=ROI_MARGIN,
+        include_full_frame=ROI_INCLUDE_FULL_FRAME,
+    ) if ROI_ENABLED else None
+    # One row per job, or up to one per region of every job
+    rows = batch_size * (1 + ROI_MAX_REGIONS) if extractor is not None else batch_size
+    batch = np.empty((rows,) + INPUT_SHAPE, dtype=np.float32)
+    logger.info("Verification worker ready (%s backend)", INFERENCE_BACKEND)
+
+    def retry(job, error):
+        try:
+            retry_or_give_up(queue, posts_table, user_stats_table, job, error)
+        except Exception as e:
+            # The job stays leased; once the lease expires it is claimed and given up on again
+            logger.warning("Could not mark post %s unverifiable: %s", job["post_id"], e)
+
+    while True:
+        jobs = queue.claim(batch_size)
+        if not jobs:
+            time.sleep(VERIFICATION_POLL_SECONDS)
+            continue
+
+        loaded = []  # (job, first batch row, row count)
+        used = 0
+        for job in jobs:
+            try:
+                with download_original(s3_client, job["bucket"], job["s3_key"]) as image:
+                    if extractor is None:
+                        preprocess_into(image, batch[used])
+                        count = 1
+                    else:
+                        _, crops = extractor.extract(*extractor.open(image))
+                        for row, crop in enumerate(crops):
+                            normalize_into(crop, batch[used + row])
+                        count = len(crops)
+                loaded.append((job, used, count))
+                used += count
+            except Exception as e:
+                logger.warning("Could not load post %s: %s", job["post_id"], e)
+                retry(job, str(e))
+        if not loaded:
+            continue
+
+        try:
+            scores = backend.predict(batch[:used])[:, 0]
+        except Exception as e:
+            logger.exception("Inference failed for %d jobs", len(loaded))
+            for job, _, _ in loaded:
+                retry(job, str(e))
+            continue
+
+        for job, start, count in loaded:
+            score = aggregate(scores[start:start + count], ROI_AGGREGATE) if extractor is not None else scores[start]
+            try:
+                apply_verdict(posts_table, user_stats_table, job, bool(score <= 0.5))
+                queue.complete(job["id"])
+            except Exception as e:
+                logger.warning("Could not record verdict for post %s: %s", job["post_id"], e)
+                retry(job, str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=BATCH_MAX_SIZE)
+    args = parser.parse_args(argv)
+
+    # spawn so each worker initializes its own framework state and boto3 clients
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=run_worker, args=(args.batch_size,), name=f"verifier-{i}")
+        for i in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
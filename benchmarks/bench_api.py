@@ -0,0 +1,429 @@
+"""End-to-end benchmark of the API against local S3/DynamoDB stand-ins, with machine-readable results.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_api.py [--json results.json] [--baseline previous.json]
+    python benchmarks/bench_api.py --feed-sizes 1000,10000,100000,1000000 --concurrency 1,4,16,64
+    python benchmarks/bench_api.py --backend keras     # the real model from backend/config.py
+    python benchmarks/bench_api.py --endpoint-url http://localhost:5000   # an already running stand-in
+
+Without --endpoint-url a moto server (`pip install "moto[server]"`) is started
+in-process. The app from backend/app.py is served by uvicorn on a local port
+with its AWS endpoints pointed at the stand-in and, by default, a stub model
+whose forward pass costs --stub-batch-ms plus --stub-image-ms per image, so
+runs are comparable across machines without TensorFlow. Measured:
+
+- score_upload: single-image latency of the path uploads take (executors and
+  the micro-batcher, including its BATCH_MAX_WAIT_MS flush delay); every call
+  scores a distinct image so the verdict cache does not answer
+- preprocess: decode/resize/normalize throughput for a 1920x1080 JPEG, on one
+  thread and on INFERENCE_WORKERS threads
+- feed: GET /posts first-page and deeper-page latency as the posts table grows
+  through --feed-sizes (seeding 1M posts into moto takes a while)
+- create_post: POST /posts throughput and latency at each --concurrency level;
+  every request uploads a distinct image so the verdict cache does not hide
+  inference
+
+--baseline compares against an earlier --json file and flags latencies or
+throughputs that moved by more than --threshold percent.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import requests
+from PIL import Image
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "backend"))
+
+import config  # noqa: E402
+import inference_backends  # noqa: E402
+from preprocessing import INPUT_SHAPE, preprocess_into  # noqa: E402
+
+
+class StubBackend:
+    """Deterministic stand-in for the classifier with a configurable forward-pass cost."""
+
+    name = "stub"
+    modules = ()
+    batch_seconds = 0.0
+    image_seconds = 0.0
+
+    def __init__(self, path, num_threads=None):
+        pass
+
+    def predict(self, batch):
+        time.sleep(self.batch_seconds + self.image_seconds * len(batch))
+        return (batch.mean(axis=(1, 2, 3)) * 0.5 + 0.5).reshape(len(batch), 1).astype(np.float32)
+
+
+def make_jpeg(size, seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(size[1], size[0], 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def summarize(samples, elapsed=None):
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+    result = {
+        "count": len(samples),
+        "p50_ms": statistics.median(samples) * 1000.0,
+        "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)] * 1000.0,
+        "p99_ms": samples[max(0, int(len(samples) * 0.99) - 1)] * 1000.0,
+    }
+    if elapsed:
+        result["per_s"] = len(samples) / elapsed
+    return result
+
+
+def start_moto():
+    from moto.server import ThreadedMotoServer
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    return server, f"http://{host}:{port}"
+
+
+def configure(args, endpoint_url, workdir):
+    """Points backend/config.py at the stand-ins before app.py is imported."""
+    config.AWS_ACCESS_KEY = config.AWS_ACCESS_KEY or "bench"
+    config.AWS_SECRET_KEY = config.AWS_SECRET_KEY or "bench"
+    config.AWS_ENDPOINT_URLS = {"s3": endpoint_url, "dynamodb": endpoint_url}
+    config.VERDICT_CACHE_SQLITE_PATH = os.path.join(workdir, "verdict_cache.sqlite3")
+    config.VERIFY_ASYNC = False
+    config.AWS_ASYNC_CLIENTS = False
+    try:
+        import prometheus_client  # noqa: F401
+    except ImportError:
+        config.METRICS_ENABLED = False
+    if args.backend == "stub":
+        StubBackend.batch_seconds = args.stub_batch_ms / 1000.0
+        StubBackend.image_seconds = args.stub_image_ms / 1000.0
+        inference_backends.BACKENDS["stub"] = StubBackend
+        model_path = os.path.join(workdir, "stub.model")
+        with open(model_path, "wb") as f:
+            f.write(b"stub")
+        config.INFERENCE_MODEL_PATHS["stub"] = model_path
+    config.INFERENCE_BACKEND = args.backend
+
+
+def create_fixtures(app_module):
+    from migrate import create_tables
+
+    create_tables(app_module.dynamodb)
+    for bucket in (config.S3_BUCKET_NAME, config.S3_BUCKET_NAME_POSTS):
+        try:
+            app_module.s3_client.create_bucket(Bucket=bucket)
+        except app_module.s3_client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+
+def seed_users(app_module, count):
+    user_ids = [f"bench-user-{i}" for i in range(count)]
+    with app_module.registration_table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
+        for user_id in user_ids:
+            batch.put_item(Item={
+                "id": user_id,
+                "username": user_id,
+                "email": f"{user_id}@example.com",
+                "password": "bench",
+                "profile_image_url": "",
+                "profile_image_variants": {},
+                "timestamp": "2024-01-01T00:00:00",
+            })
+    return user_ids
+
+
+def seed_posts(app_module, user_ids, start, stop):
+    """Adds posts numbered start..stop-1 with increasing timestamps."""
+    epoch = datetime(2024, 1, 1)
+    with app_module.posts_table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
+        for i in range(start, stop):
+            batch.put_item(Item={
+                "id": f"bench-post-{i}",
+                "user_id": user_ids[i % len(user_ids)],
+                "content": f"Benchmark post {i}",
+                "status": i % 3 != 0,
+                "image_url": "",
+                "image_variants": {},  # keeps feed reads from scheduling derivative renders
+                "feed": config.FEED_PARTITION,
+                "timestamp": (epoch + timedelta(seconds=i)).isoformat(),
+            })
+
+
+class Server:
+    """Runs the FastAPI app under uvicorn on a background thread."""
+
+    def __init__(self, app, port):
+        import uvicorn
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self.url = f"http://127.0.0.1:{port}"
+
+    def start(self, timeout=300.0):
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(f"{self.url}/readyz", timeout=5).status_code == 200:
+                    return
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("API did not become ready")
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(30)
+
+
+def bench_score_upload(app_module, repeat):
+    images = [make_jpeg((640, 480), seed=1000 + i) for i in range(repeat + 1)]
+
+    async def run():
+        await app_module.score_upload(io.BytesIO(images[0]))  # warm up
+        samples = []
+        for data in images[1:]:
+            started = time.perf_counter()
+            await app_module.score_upload(io.BytesIO(data))
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    return summarize(asyncio.run(run()))
+
+
+def bench_preprocess(repeat, workers):
+    data = make_jpeg((1920, 1080), seed=2)
+    out = np.empty((workers,) + INPUT_SHAPE, dtype=np.float32)
+    preprocess_into(data, out[0])  # warm up
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        preprocess_into(data, out[0])
+    single = repeat / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda i: preprocess_into(data, out[i % workers]), range(repeat * workers)))
+    parallel = repeat * workers / (time.perf_counter() - started)
+    return {"image": "1920x1080", "images_per_s": single, "workers": workers, "parallel_images_per_s": parallel}
+
+
+def bench_feed(app_module, server, sizes, user_ids, repeat, page_size, depth):
+    results = []
+    seeded = 0
+    session = requests.Session()
+    for size in sizes:
+        started = time.perf_counter()
+        seed_posts(app_module, user_ids, seeded, size)
+        seed_seconds = time.perf_counter() - started
+        seeded = size
+
+        first, deep = [], []
+        for _ in range(repeat):
+            cursor = None
+            for page in range(depth):
+                params = {"limit": page_size}
+                if cursor:
+                    params["cursor"] = cursor
+                started = time.perf_counter()
+                response = session.get(f"{server.url}/posts", params=params, timeout=60)
+                elapsed = time.perf_counter() - started
+                response.raise_for_status()
+                (first if page == 0 else deep).append(elapsed)
+                cursor = response.json()["next_cursor"]
+                if not cursor:
+                    break
+        results.append({
+            "posts": size,
+            "seed_s": seed_seconds,
+            "first_page": summarize(first),
+            f"pages_2_to_{depth}": summarize(deep),
+        })
+        print(f"feed {size:>8} posts | first page p50 {results[-1]['first_page'].get('p50_ms', 0):7.1f} ms")
+    return results
+
+
+def bench_create_post(server, user_ids, concurrency_levels, seconds):
+    results = []
+    counter = iter(range(10 ** 9))
+    counter_lock = threading.Lock()
+    for concurrency in concurrency_levels:
+        deadline = time.monotonic() + seconds
+        samples = [[] for _ in range(concurrency)]
+        errors = [0] * concurrency
+
+        def client(index):
+            session = requests.Session()
+            while time.monotonic() < deadline:
+                with counter_lock:
+                    seed = next(counter)
+                image = make_jpeg((320, 240), seed=1000 + seed)
+                started = time.perf_counter()
+                response = session.post(
+                    f"{server.url}/posts",
+                    data={"user_id": user_ids[seed % len(user_ids)], "content": f"bench {uuid.uuid4()}"},
+                    files={"image": (f"bench_{seed}.jpg", image, "image/jpeg")},
+                    timeout=120,
+                )
+                elapsed = time.perf_counter() - started
+                if response.status_code == 200:
+                    samples[index].append(elapsed)
+                else:
+                    errors[index] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(client, range(concurrency)))
+        elapsed = time.perf_counter() - started
+        result = {"concurrency": concurrency, "errors": sum(errors), **summarize(
+            [sample for client_samples in samples for sample in client_samples], elapsed
+        )}
+        results.append(result)
+        print(
+            f"POST /posts concurrency {concurrency:>3} | {result.get('per_s', 0):7.1f} req/s | "
+            f"p50 {result.get('p50_ms', 0):7.1f} ms | p99 {result.get('p99_ms', 0):7.1f} ms | {result['errors']} errors"
+        )
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "backend": args.backend,
+        "stub_batch_ms": args.stub_batch_ms,
+        "stub_image_ms": args.stub_image_ms,
+        "batch_max_size": config.BATCH_MAX_SIZE,
+        "batch_max_wait_ms": config.BATCH_MAX_WAIT_MS,
+        "inference_executor": config.INFERENCE_EXECUTOR,
+    }
+
+
+def _comparable(results, path=""):
+    """Yields (path, value, higher_is_better) for the latency and throughput leaves of a results dict."""
+    if isinstance(results, dict):
+        for key, value in results.items():
+            yield from _comparable(value, f"{path}.{key}" if path else key)
+    elif isinstance(results, list):
+        # Runs are keyed by their table size / concurrency so they line up across files
+        for entry in results:
+            label = entry.get("posts", entry.get("concurrency")) if isinstance(entry, dict) else None
+            yield from _comparable(entry, f"{path}[{label}]")
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        if path.endswith("_ms"):
+            yield path, results, False
+        elif path.endswith("per_s"):
+            yield path, results, True
+
+
+def compare(baseline, results, threshold):
+    previous = {path: value for path, value, _ in _comparable(baseline["results"])}
+    regressions = 0
+    for path, value, higher_is_better in _comparable(results):
+        before = previous.get(path)
+        if not before:
+            continue
+        change = (value - before) / before * 100.0
+        worse = change < -threshold if higher_is_better else change > threshold
+        better = change > threshold if higher_is_better else change < -threshold
+        if worse or better:
+            regressions += worse
+            print(f"{'REGRESSION' if worse else 'improved':>10} {path}: {before:.2f} -> {value:.2f} ({change:+.1f}%)")
+    print(f"{regressions} regressions beyond {threshold:.0f}% vs. {baseline['meta'].get('commit')}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", help="S3/DynamoDB stand-in to use instead of starting moto")
+    parser.add_argument("--backend", default="stub", help='"stub" or an INFERENCE_BACKEND name')
+    parser.add_argument("--stub-batch-ms", type=float, default=20.0)
+    parser.add_argument("--stub-image-ms", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--feed-sizes", default="1000,10000")
+    parser.add_argument("--feed-depth", type=int, default=5, help="pages to follow per feed read")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each POST /posts level")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json results to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change reported by --baseline")
+    args = parser.parse_args(argv)
+    args.json = os.path.abspath(args.json) if args.json else None
+    args.baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    moto_server = None
+    endpoint_url = args.endpoint_url
+    if endpoint_url is None:
+        moto_server, endpoint_url = start_moto()
+    workdir = tempfile.mkdtemp(prefix="bench_api_")
+    configure(args, endpoint_url, workdir)
+    # Imported only now, so module-level clients and the model see the settings above;
+    # model paths in config.py are relative to the backend directory
+    os.chdir(os.path.join(BENCHMARK_DIR, "..", "backend"))
+    import app as app_module
+
+    server = Server(app_module.app, args.port)
+    try:
+        create_fixtures(app_module)
+        user_ids = seed_users(app_module, args.users)
+        server.start()
+        results = {
+            "score_upload": bench_score_upload(app_module, args.repeat),
+            "preprocess": bench_preprocess(args.repeat, config.INFERENCE_WORKERS),
+        }
+        print(f"score_upload p50 {results['score_upload']['p50_ms']:.1f} ms | "
+              f"preprocess {results['preprocess']['images_per_s']:.0f} img/s")
+        results["feed"] = bench_feed(
+            app_module, server, [int(size) for size in args.feed_sizes.split(",")], user_ids,
+            args.repeat, config.FEED_DEFAULT_PAGE_SIZE, args.feed_depth,
+        )
+        results["create_post"] = bench_create_post(
+            server, user_ids, [int(level) for level in args.concurrency.split(",")], args.seconds
+        )
+    finally:
+        server.stop()
+        if moto_server is not None:
+            moto_server.stop()
+
+    report = {"benchmark": "api", "meta": metadata(args), "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(json.load(f), results, args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Throughput and latency of concurrent S3/DynamoDB calls vs. botocore connection pool size.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_aws_pool.py [--threads 48] [--pool-sizes 10,16,32,64] [--seconds 10] [--json results.json]
+    python benchmarks/bench_aws_pool.py --endpoint-url http://localhost:5000   # an already running stand-in
+
+Without --endpoint-url a moto server (`pip install "moto[server]"`) is started
+in-process. --threads workers, as many as the API's I/O pool plus its sync-route
+threadpool would run, loop over the calls the API makes per request (S3
+put_object/get_object of a small image-sized object, DynamoDB put_item/get_item)
+through clients built by backend/aws_clients.py. With fewer pooled connections
+than threads, calls queue for a connection and the p99 grows; the run where
+throughput stops improving is the pool size to configure.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from aws_clients import CallMetrics, make_client, make_client_config, make_resource, make_session  # noqa: E402
+
+BUCKET = "bench-pool"
+TABLE = "bench_pool"
+OBJECT_BYTES = 200 * 1024
+
+
+def start_moto():
+    from moto.server import ThreadedMotoServer
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    return server, f"http://{host}:{port}"
+
+
+def make_clients(endpoint_url, pool_size, metrics):
+    session = make_session("bench", "bench", "us-east-1")
+    config = make_client_config(pool_size, retry_mode="standard", max_attempts=3)
+    s3_client = make_client(session, "s3", config, metrics, endpoint_url)
+    table = make_resource(session, "dynamodb", config, metrics, endpoint_url).Table(TABLE)
+    return s3_client, table
+
+
+def create_fixtures(endpoint_url):
+    s3_client, table = make_clients(endpoint_url, 10, None)
+    # Either may be left over from an earlier run against the same stand-in
+    try:
+        s3_client.create_bucket(Bucket=BUCKET)
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "BucketAlreadyOwnedByYou":
+            raise
+    try:
+        table.meta.client.create_table(
+            TableName=TABLE,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ResourceInUseException":
+            raise
+    table.wait_until_exists()
+
+
+def run(endpoint_url, pool_size, threads, seconds):
+    metrics = CallMetrics()
+    s3_client, table = make_clients(endpoint_url, pool_size, metrics)
+    body = os.urandom(OBJECT_BYTES)
+    deadline = time.monotonic() + seconds
+    latencies = [[] for _ in range(threads)]
+
+    def worker(samples):
+        while time.monotonic() < deadline:
+            item_id = str(uuid.uuid4())
+            started = time.perf_counter()
+            s3_client.put_object(Bucket=BUCKET, Key=f"uploads/{item_id}", Body=body)
+            table.put_item(Item={"id": item_id, "status": True})
+            table.get_item(Key={"id": item_id})
+            s3_client.get_object(Bucket=BUCKET, Key=f"uploads/{item_id}")["Body"].read()
+            samples.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(sample for thread_samples in latencies for sample in thread_samples)
+    return {
+        "pool_size": pool_size,
+        "threads": threads,
+        "requests": len(samples),
+        "requests_per_s": len(samples) / elapsed,
+        "p50_ms": statistics.median(samples) * 1000.0,
+        "p99_ms": samples[max(0, int(len(samples) * 0.99) - 1)] * 1000.0,
+        "calls": metrics.stats(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint-url", help="S3/DynamoDB stand-in to use instead of starting moto")
+    parser.add_argument("--threads", type=int, default=48)
+    parser.add_argument("--pool-sizes", default="10,16,32,64")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if endpoint_url is None:
+        server, endpoint_url = start_moto()
+    try:
+        create_fixtures(endpoint_url)
+        results = []
+        for pool_size in (int(size) for size in args.pool_sizes.split(",")):
+            result = run(endpoint_url, pool_size, args.threads, args.seconds)
+            results.append(result)
+            print(
+                f"pool {pool_size:>4} | {result['requests_per_s']:8.1f} req/s | "
+                f"p50 {result['p50_ms']:7.1f} ms | p99 {result['p99_ms']:7.1f} ms"
+            )
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "aws_pool", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Size and serialization cost of GET /posts bodies: FastAPI's default encoding vs. backend/http_cache.py.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_feed_response.py [--posts 10000] [--repeat 20] [--json results.json]
+
+Builds --posts synthetic feed entries shaped like `join_post` output and times
+what each request costs: the default path (jsonable_encoder, then
+JSONResponse's json.dumps; plain json.dumps when FastAPI is not installed),
+`http_cache.dumps` (orjson when installed), computing the page's ETag, and
+gzip/brotli compression of the body. Sizes are reported for the raw body and
+each encoding. A 304 revalidation costs only the ETag; a repeated request with
+a new client costs only a cache lookup.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from config import RESPONSE_BROTLI_QUALITY, RESPONSE_GZIP_LEVEL  # noqa: E402
+from http_cache import brotli, dumps, make_etag, orjson  # noqa: E402
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+WORDS = "breaking news photo verified local report city council storm market election community update".split()
+
+
+def make_posts(count, seed=0):
+    rng = random.Random(seed)
+    users = [(str(uuid.UUID(int=rng.getrandbits(128))), f"user{i}") for i in range(max(1, count // 20))]
+    now = datetime(2025, 1, 1)
+    posts = []
+    for i in range(count):
+        user_id, username = rng.choice(users)
+        post_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        posts.append({
+            "id": post_id,
+            "user_id": user_id,
+            "username": username,
+            "email": f"{username}@example.com",
+            "user_profile_image_url": f"https://truepix.s3.us-east-1.amazonaws.com/derivatives/64/profile_images/{username}.webp",
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 40))),
+            "post_image_url": f"https://truepix-posts.s3.us-east-1.amazonaws.com/derivatives/1080/posts/{post_id}.webp",
+            "post_image_original_url": f"https://truepix-posts.s3.us-east-1.amazonaws.com/posts/{post_id}.jpg",
+            "status": rng.random() > 0.2,
+            "timestamp": (now - timedelta(seconds=i * 37)).isoformat(),
+        })
+    return {"posts": posts, "next_cursor": None}
+
+
+def default_encode(body):
+    content = jsonable_encoder(body) if jsonable_encoder is not None else body
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def etag(body):
+    parts = [body["next_cursor"], 600, 50]
+    for post in body["posts"]:
+        parts.extend((
+            post["id"], post["status"], post["post_image_url"],
+            post["user_profile_image_url"], post["username"], post["email"],
+        ))
+    return make_etag(parts)
+
+
+def measure(fn, arg, repeat):
+    fn(arg)  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": statistics.median(timings) * 1000.0,
+        "p95_ms": sorted(timings)[max(0, int(len(timings) * 0.95) - 1)] * 1000.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    body = make_posts(args.posts)
+    raw = dumps(body)
+    timings = {
+        "default_encode": measure(default_encode, body, args.repeat),
+        "compact_encode": measure(dumps, body, args.repeat),
+        "etag": measure(etag, body, args.repeat),
+        "gzip": measure(lambda data: gzip.compress(data, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0), raw, args.repeat),
+    }
+    sizes = {
+        "default": len(default_encode(body)),
+        "compact": len(raw),
+        "gzip": len(gzip.compress(raw, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)),
+    }
+    if brotli is not None:
+        timings["brotli"] = measure(lambda data: brotli.compress(data, quality=RESPONSE_BROTLI_QUALITY), raw, args.repeat)
+        sizes["brotli"] = len(brotli.compress(raw, quality=RESPONSE_BROTLI_QUALITY))
+
+    print(f"{args.posts} posts; default = {'jsonable_encoder + ' if jsonable_encoder else ''}json.dumps, "
+          f"compact = {'orjson' if orjson is not None else 'json.dumps'}")
+    for name, timing in timings.items():
+        print(f"  {name:<15} {timing['median_ms']:9.2f} ms median {timing['p95_ms']:9.2f} ms p95")
+    for name, size in sizes.items():
+        print(f"  {name:<15} {size / 1024.0:9.1f} KiB ({size / sizes['default'] * 100.0:5.1f}% of default)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "benchmark": "feed_response",
+                "posts": args.posts,
+                "encoder": "orjson" if orjson is not None else "json",
+                "timings": timings,
+                "sizes": sizes,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
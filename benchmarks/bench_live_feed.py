@@ -0,0 +1,103 @@
+"""Fan-out cost and per-connection memory of the live feed broadcaster (backend/live_feed.py).
+
+Usage (from the repository root):
+
+    python benchmarks/bench_live_feed.py [--subscribers 1000,5000,20000] [--events 200] [--json results.json]
+
+For each subscriber count, that many idle streams are parked on
+`Subscriber.wait` (as GET /posts/stream does between heartbeats) and
+--events post-sized events are published while every stream drains its
+buffer. Reported: memory per parked subscriber (tracemalloc, excluding the
+HTTP connection itself), mean publish time and the delay from publish until
+the last subscriber received the event.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from live_feed import FeedBroadcaster  # noqa: E402
+
+POST = {
+    "id": "0f8fad5b-d9cb-469f-a165-70867728950e",
+    "user_id": "7c9e6679-7425-40de-944b-e07fc1f90ae7",
+    "username": "newsroom",
+    "email": "newsroom@example.com",
+    "user_profile_image_url": "https://truepix.s3.us-east-1.amazonaws.com/profile_images/newsroom.jpg",
+    "content": "Storm damage on the coast road this morning, photo from our reporter",
+    "post_image_url": "https://truepix-posts.s3.us-east-1.amazonaws.com/uploads/storm.jpg",
+    "post_image_original_url": "https://truepix-posts.s3.us-east-1.amazonaws.com/uploads/storm.jpg",
+    "status": "pending",
+    "timestamp": "2025-01-01T08:00:00",
+}
+
+
+async def run(count, events):
+    broadcaster = FeedBroadcaster(buffer_size=64, replay_size=1024, max_subscribers=count)
+    received = [0] * events
+    last_received = [0.0] * events
+
+    async def stream(subscriber):
+        seen = 0
+        while seen < events:
+            for _ in await subscriber.wait(30):
+                last_received[seen] = time.perf_counter()
+                received[seen] += 1
+                seen += 1
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tasks = [asyncio.create_task(stream(broadcaster.subscribe())) for _ in range(count)]
+    await asyncio.sleep(0)  # let every stream park on its wakeup event
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    publish_times, delivery_delays = [], []
+    for index in range(events):
+        started = time.perf_counter()
+        broadcaster.publish("post", POST)
+        publish_times.append(time.perf_counter() - started)
+        await asyncio.sleep(0.001)  # streams drain on the event loop, as between requests
+        await asyncio.sleep(0)
+        delivery_delays.append(max(0.0, last_received[index] - started))
+    await asyncio.wait_for(asyncio.gather(*tasks), 60)
+    assert all(count == total for total in received), "an event was not delivered to every subscriber"
+    return {
+        "subscribers": count,
+        "bytes_per_subscriber": (after - before) / count,
+        "publish_ms": statistics.mean(publish_times) * 1000.0,
+        "delivery_ms": statistics.median(delivery_delays) * 1000.0,
+        "dropped": broadcaster.stats()["dropped"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", default="1000,5000,20000")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in (int(value) for value in args.subscribers.split(",")):
+        result = asyncio.run(run(count, args.events))
+        results.append(result)
+        print(
+            f"{count:>7} subscribers | {result['bytes_per_subscriber'] / 1024.0:6.2f} KiB each | "
+            f"publish {result['publish_ms']:7.3f} ms | delivered to all in {result['delivery_ms']:7.3f} ms | "
+            f"dropped {result['dropped']}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "live_feed", "events": args.events, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Per-image latency and peak allocation of image preprocessing: original pipeline vs. backend/preprocessing.py.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_preprocess.py [--repeat 50] [--json results.json]
+
+The "legacy" pipeline is the original PIL convert -> resize -> img_to_array ->
+expand_dims -> preprocess_input path. It uses Keras when TensorFlow is installed
+and an equivalent NumPy implementation otherwise. Peak allocation is measured
+with tracemalloc, which sees NumPy buffers but not Pillow's internal decode
+buffers.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from preprocessing import INPUT_SHAPE, preprocess_into  # noqa: E402
+
+try:
+    from tensorflow.keras.preprocessing.image import img_to_array
+    from tensorflow.keras.applications.xception import preprocess_input
+except ImportError:
+    def img_to_array(image):
+        return np.asarray(image, dtype=np.float32).copy()
+
+    def preprocess_input(x):
+        x = x / 127.5
+        x -= 1.0
+        return x
+
+
+SIZES = [(640, 480), (1920, 1080), (4000, 3000)]
+
+
+def legacy_preprocess(data):
+    image = Image.open(io.BytesIO(data))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image = image.resize((150, 150))
+    image = img_to_array(image)
+    image = np.expand_dims(image, axis=0)
+    return preprocess_input(image)
+
+
+def make_jpeg(size, seed=0):
+    rng = np.random.default_rng(seed)
+    # Smooth gradients plus noise compress like a photo rather than like pure noise
+    y, x = np.mgrid[0:size[1], 0:size[0]]
+    base = np.stack([(x * 255 // size[0]), (y * 255 // size[1]), ((x + y) * 255 // (size[0] + size[1]))], axis=-1)
+    noise = rng.integers(0, 32, size=base.shape)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def measure(fn, data, repeat):
+    fn(data)  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": statistics.median(timings) * 1000.0,
+        "p95_ms": sorted(timings)[max(0, int(len(timings) * 0.95) - 1)] * 1000.0,
+        "peak_alloc_kib": peak / 1024.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    # Rows of one reused batch buffer, as the batch predictor does
+    batch = np.empty((1,) + INPUT_SHAPE, dtype=np.float32)
+
+    def optimized(data):
+        return preprocess_into(data, batch[0])
+
+    results = []
+    for size in SIZES:
+        data = make_jpeg(size)
+        legacy = measure(legacy_preprocess, data, args.repeat)
+        new = measure(optimized, data, args.repeat)
+        drift = float(np.abs(legacy_preprocess(data)[0] - optimized(data)).mean())
+        results.append({"size": f"{size[0]}x{size[1]}", "legacy": legacy, "optimized": new, "mean_abs_diff": drift})
+        print(
+            f"{size[0]}x{size[1]:<5} legacy {legacy['median_ms']:8.2f} ms {legacy['peak_alloc_kib']:9.0f} KiB | "
+            f"optimized {new['median_ms']:8.2f} ms {new['peak_alloc_kib']:9.0f} KiB | "
+            f"speedup {legacy['median_ms'] / new['median_ms']:5.1f}x | mean |diff| {drift:.4f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "preprocess", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cost of face-aware region extraction (backend/regions.py) vs. image resolution and face count.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_roi.py [--repeat 20] [--images photos/] [--json results.json]
+
+Needs opencv-python-headless. Synthetic JPEGs from 640x480 to 6000x4000 show how
+decode + detection + cropping scales with resolution (no faces are found in
+them). With --images, every JPEG/PNG in the folder is also timed and reported
+with the number of faces found, which is what the number of scored crops, and
+so the forward-pass cost, follows. Full-frame preprocessing is timed alongside
+for reference.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from bench_preprocess import make_jpeg  # noqa: E402
+from config import (  # noqa: E402
+    ROI_WORK_SIZE,
+    ROI_DETECT_SIZE,
+    ROI_MIN_FACE_PX,
+    ROI_MAX_REGIONS,
+    ROI_MARGIN,
+)
+from preprocessing import INPUT_SHAPE, preprocess_into  # noqa: E402
+from regions import FaceDetector, RegionExtractor  # noqa: E402
+
+SIZES = [(640, 480), (1920, 1080), (4000, 3000), (6000, 4000)]
+
+
+def median_ms(fn, data, repeat):
+    fn(data)  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000.0
+
+
+def measure(extractor, data, repeat):
+    row = np.empty(INPUT_SHAPE, dtype=np.float32)
+    boxes, _ = extractor.extract(*extractor.open(data))
+    return {
+        "faces": sum(box is not None for box in boxes),
+        "regions_ms": median_ms(lambda d: extractor.extract(*extractor.open(d)), data, repeat),
+        "full_frame_ms": median_ms(lambda d: preprocess_into(d, row), data, repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--images", help="folder of real photos to time and count faces in")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    extractor = RegionExtractor(
+        FaceDetector(min_size=ROI_MIN_FACE_PX),
+        work_size=ROI_WORK_SIZE,
+        detect_size=ROI_DETECT_SIZE,
+        max_regions=ROI_MAX_REGIONS,
+        margin=ROI_MARGIN,
+    )
+    samples = [(f"synthetic {width}x{height}", make_jpeg((width, height))) for width, height in SIZES]
+    if args.images:
+        for name in sorted(os.listdir(args.images)):
+            if name.lower().endswith((".jpg", ".jpeg", ".png")):
+                with open(os.path.join(args.images, name), "rb") as f:
+                    samples.append((name, f.read()))
+
+    results = []
+    for name, data in samples:
+        result = {"image": name, **measure(extractor, data, args.repeat)}
+        results.append(result)
+        print(
+            f"{name:<28} faces {result['faces']:2d} | regions {result['regions_ms']:8.2f} ms | "
+            f"full frame {result['full_frame_ms']:8.2f} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "roi", "work_size": ROI_WORK_SIZE, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Accuracy vs. latency vs. memory of the inference backends on a local labeled image folder.
+
+Usage (from the repository root):
+
+    python benchmarks/compare_backends.py images/ \\
+        --backend keras=backend/fine_tuned_xception_best_model.keras \\
+        --backend tflite=backend/fine_tuned_xception_best_model.fp16.tflite \\
+        --backend tflite=backend/fine_tuned_xception_best_model.int8.tflite \\
+        --backend onnx=backend/fine_tuned_xception_best_model.onnx \\
+        [--batch-size 16] [--repeat 5] [--json results.json]
+
+The folder must contain `real/` and `fake/` subfolders of images. Each backend
+runs in its own spawned process, so the reported peak RSS is that backend's
+resident memory on its own (runtime + weights + activations), as it would be
+per API worker. Agreement is measured against the first --backend given.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from preprocessing import INPUT_SHAPE, preprocess_into  # noqa: E402
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+LABELS = {"real": 0, "fake": 1}
+
+
+def load_dataset(root):
+    """Returns (inputs, labels, paths) for every image under root/real and root/fake."""
+    paths, labels = [], []
+    for label_name, label in LABELS.items():
+        folder = os.path.join(root, label_name)
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(folder, name))
+                labels.append(label)
+    inputs = np.empty((len(paths),) + INPUT_SHAPE, dtype=np.float32)
+    for i, path in enumerate(paths):
+        with open(path, "rb") as f:
+            preprocess_into(f.read(), inputs[i])
+    return inputs, np.array(labels), paths
+
+
+def time_calls(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_backend(name, path, inputs, batch_size, repeat, num_threads):
+    """Loads one backend and scores the dataset; runs inside its own process."""
+    sys.path.insert(0, BACKEND_DIR)
+    from inference_backends import load_backend
+
+    started = time.perf_counter()
+    backend = load_backend(name, path, num_threads=num_threads)
+    load_ms = (time.perf_counter() - started) * 1000.0
+
+    scores = np.concatenate([
+        backend.predict(inputs[start:start + batch_size])[:, 0] for start in range(0, len(inputs), batch_size)
+    ])
+
+    single = inputs[:1]
+    backend.predict(single)  # warm up
+    single_ms = [t * 1000.0 for t in time_calls(lambda: backend.predict(single), repeat * 10)]
+    batch = inputs[:batch_size]
+    backend.predict(batch)
+    batch_ms = [t * 1000.0 / len(batch) for t in time_calls(lambda: backend.predict(batch), repeat)]
+
+    return {
+        "backend": name,
+        "path": path,
+        "model_mib": os.path.getsize(path) / 2 ** 20,
+        "load_ms": load_ms,
+        "batch1_median_ms": statistics.median(single_ms),
+        "batch1_p95_ms": sorted(single_ms)[max(0, int(len(single_ms) * 0.95) - 1)],
+        "batch_size": len(batch),
+        "batch_per_image_ms": statistics.median(batch_ms),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        "scores": scores.tolist(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="folder with real/ and fake/ subfolders")
+    parser.add_argument("--backend", action="append", required=True, metavar="NAME=PATH",
+                        help="backend name (keras, tflite, onnx) and model file; repeatable")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, help="intra-op threads for tflite/onnx")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    inputs, labels, paths = load_dataset(args.images)
+    print(f"{len(paths)} images ({int(labels.sum())} fake, {int(len(labels) - labels.sum())} real)")
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    reference = None
+    for spec in args.backend:
+        name, _, path = spec.partition("=")
+        with context.Pool(1) as pool:
+            result = pool.apply(run_backend, (name, path, inputs, args.batch_size, args.repeat, args.threads))
+        predicted = np.array(result["scores"]) > 0.5
+        if reference is None:
+            reference = predicted
+        result["accuracy"] = float((predicted == labels.astype(bool)).mean())
+        result["agreement"] = float((predicted == reference).mean())
+        results.append(result)
+        print(
+            f"{name:<7} {os.path.basename(path):<45} {result['model_mib']:7.1f} MiB | "
+            f"acc {result['accuracy']:.3f} agree {result['agreement']:.3f} | "
+            f"b1 {result['batch1_median_ms']:7.2f} ms  b{result['batch_size']} {result['batch_per_image_ms']:7.2f} ms/img | "
+            f"rss {result['peak_rss_mib']:7.0f} MiB | load {result['load_ms']:7.0f} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "compare_backends", "images": paths, "labels": labels.tolist(),
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
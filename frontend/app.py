@@ -1,3 +1,6 @@
+import html
+import time
+
 import streamlit as st
 import requests
 from datetime import datetime
@@ -61,6 +64,15 @@ if "user_data" not in st.session_state:
 
 # FastAPI backend URL
 FASTAPI_URL = "http://127.0.0.1:8000"
+FEED_PAGE_SIZE = 20  # posts per page; only the first page is fetched before the feed shows
+FEED_IMAGE_WIDTH = 600  # display width of post images; the backend serves the smallest derivative this wide
+FEED_AVATAR_SIZE = 50
+FEED_WINDOW_PAGES = 3  # pages kept in session state and rendered; loading more drops the newest ones
+FEED_MAX_POSTS = FEED_PAGE_SIZE * FEED_WINDOW_PAGES
+FEED_REFRESH_SECONDS = 15  # reruns within this window reuse the cached feed without calling the backend
+STATS_REFRESH_SECONDS = 30  # same for the sidebar's real/fake image counts
+HTTP_POOL_SIZE = 10  # keep-alive connections to the backend
+HTTP_TIMEOUT = 10  # seconds
 
 # Apply Custom CSS for Rounded Profile Image
 st.markdown(
@@ -100,14 +112,44 @@ def calculate_maturity(timestamp):
     except Exception:
         return "Unknown"
 
+@st.cache_resource
+def http_session():
+    """One keep-alive connection pool to the backend, shared by every rerun and browser session."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def feed_store():
+    """This browser session's feed window: up to FEED_MAX_POSTS consecutive posts, newest first.
+
+    `at_top` turns False once newer pages were dropped to make room for older
+    ones; `has_older` tells whether the feed continues below the window, and
+    `next_cursor` is the backend cursor continuing right after its last post
+    (None once a refresh trimmed the bottom of the window).
+    """
+    if "feed" not in st.session_state:
+        st.session_state.feed = {"posts": [], "fetched_at": None, "at_top": True, "has_older": False, "next_cursor": None}
+    return st.session_state.feed
+
+def invalidate_feed():
+    """Makes the next rerun refresh the feed and image stats (after posting, or on login/logout)."""
+    if not feed_store()["at_top"]:
+        back_to_newest()  # show the user's new post rather than the older page they were on
+    feed_store()["fetched_at"] = None
+    st.session_state.pop("image_stats", None)
+
 # Function to handle login
 def login(username, password):
     data = {"username": username, "password": password}
-    response = requests.post(f"{FASTAPI_URL}/login", data=data)
+    response = http_session().post(f"{FASTAPI_URL}/login", data=data, timeout=HTTP_TIMEOUT)
 
     if response.status_code == 200:
         st.session_state.logged_in = True
         st.session_state.user_data = response.json()["user_data"]
+        st.session_state.pop("feed", None)
+        invalidate_feed()
 
         st.success("Login successful!")
         st.rerun()
@@ -115,21 +157,26 @@ def login(username, password):
         st.error("Invalid username or password.")
 
 def get_user_image_stats(user_id):
-    """Fetch user's real and fake image upload count."""
+    """Fetch user's real and fake image upload count (cached for STATS_REFRESH_SECONDS)."""
+    cached = st.session_state.get("image_stats")
+    if cached and cached["user_id"] == user_id and time.monotonic() - cached["fetched_at"] < STATS_REFRESH_SECONDS:
+        return cached["stats"]
     try:
-        response = requests.get(f"{FASTAPI_URL}/user/image-stats/{user_id}")
-        if response.status_code == 200:
-            return response.json()
-        return {"real_images": 0, "fake_images": 0}  # Default if no data
+        response = http_session().get(f"{FASTAPI_URL}/user/image-stats/{user_id}", timeout=HTTP_TIMEOUT)
+        if response.status_code != 200:
+            return {"real_images": 0, "fake_images": 0}  # Default if no data
+        stats = response.json()
     except Exception:
         return {"real_images": 0, "fake_images": 0}
+    st.session_state.image_stats = {"user_id": user_id, "stats": stats, "fetched_at": time.monotonic()}
+    return stats
 
 # Function to handle registration
 def register(username, email, password, profile_image):
     files = {"profile_image": profile_image}
     data = {"username": username, "email": email, "password": password}
 
-    response = requests.post(f"{FASTAPI_URL}/register", data=data, files=files)
+    response = http_session().post(f"{FASTAPI_URL}/register", data=data, files=files, timeout=HTTP_TIMEOUT)
 
     if response.status_code == 200:
         st.success("Registration successful! You can now log in.")
@@ -147,20 +194,138 @@ def create_post(content, image):
     files = {"image": image}
     data = {"user_id": user_id, "content": content}
 
-    response = requests.post(f"{FASTAPI_URL}/posts", data=data, files=files)
+    response = http_session().post(f"{FASTAPI_URL}/posts", data=data, files=files, timeout=HTTP_TIMEOUT)
 
     if response.status_code == 200:
-        st.success("Post created successfully!")
+        if response.json()["post_data"]["status"] == "pending":
+            st.success("Post created! The image is being verified.")
+        else:
+            st.success("Post created successfully!")
+        invalidate_feed()
         st.rerun()
     else:
         st.error(response.json()["detail"])
 
-# Function to get posts
+def fetch_posts(since=None, cursor=None, max_posts=FEED_PAGE_SIZE, revalidate=False):
+    """Fetches up to `max_posts` posts, newest first, newer than `since` or after `cursor`.
+
+    Returns (posts, next_cursor), next_cursor being None when no further posts
+    match, or None on failure. With `revalidate` the first request carries the
+    ETag of the last revalidated one, and an unchanged answer comes back as an
+    empty 304.
+    """
+    params = {"image_width": FEED_IMAGE_WIDTH, "avatar_size": FEED_AVATAR_SIZE}
+    if since:
+        params["since"] = since
+    if cursor:
+        params["cursor"] = cursor
+    feed = feed_store()
+    posts = []
+    while True:
+        params["limit"] = min(FEED_PAGE_SIZE, max_posts - len(posts))
+        headers = {"If-None-Match": feed["etag"]} if revalidate and not posts and feed.get("etag") else {}
+        response = http_session().get(f"{FASTAPI_URL}/posts", params=params, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code == 304:
+            return [], None
+        if response.status_code != 200:
+            return None
+        if revalidate and not posts:
+            feed["etag"] = response.headers.get("ETag")
+        page = response.json()
+        posts.extend(page["posts"])
+        if not page["next_cursor"] or len(posts) >= max_posts:
+            return posts, page["next_cursor"]
+        params["cursor"] = page["next_cursor"]
+
+def refresh_pending(posts):
+    """Picks up verdicts for cached posts that were still being verified when they were fetched."""
+    for post in posts:
+        if post["status"] != "pending":
+            continue
+        response = http_session().get(f"{FASTAPI_URL}/posts/{post['id']}/status", timeout=HTTP_TIMEOUT)
+        if response.status_code == 200:
+            post["status"] = response.json()["status"]
+
+# Function to get posts (the feed window)
 def get_posts():
-    response = requests.get(f"{FASTAPI_URL}/posts")
-    if response.status_code == 200:
-        return response.json()
-    return []
+    """Returns the feed window, refreshing it at most every FEED_REFRESH_SECONDS.
+
+    The first call fetches one page. While the window starts at the newest post,
+    a refresh only asks the backend for posts newer than it and merges them in
+    front (trimming the oldest beyond FEED_MAX_POSTS), so reruns (every widget
+    interaction) cost nothing while the cache is fresh and little when it is not.
+    On errors the stale window is kept.
+    """
+    feed = feed_store()
+    if feed["fetched_at"] is not None and time.monotonic() - feed["fetched_at"] < FEED_REFRESH_SECONDS:
+        return feed["posts"]
+    cached = feed["posts"]
+    try:
+        if feed["at_top"]:
+            result = fetch_posts(
+                since=cached[0]["timestamp"] if cached else None,
+                max_posts=FEED_MAX_POSTS if cached else FEED_PAGE_SIZE,
+                revalidate=True,
+            )
+            if result is None:
+                return cached
+            newer, next_cursor = result
+            if not cached or next_cursor:
+                # First load, or more new posts than the window holds: start over from the newest
+                cached = []
+                feed["has_older"] = next_cursor is not None
+                feed["next_cursor"] = next_cursor
+            new_ids = {post["id"] for post in newer}
+            merged = newer + [post for post in cached if post["id"] not in new_ids]
+            if len(merged) > FEED_MAX_POSTS:
+                del merged[FEED_MAX_POSTS:]
+                feed["has_older"] = True
+                feed["next_cursor"] = None  # no longer follows the last post kept
+            feed["posts"] = merged
+        refresh_pending(cached)
+    except requests.RequestException:
+        return feed["posts"]
+    feed["fetched_at"] = time.monotonic()
+    return feed["posts"]
+
+def load_older():
+    """Appends the next page below the window, dropping the newest posts once the window is full.
+
+    Pages follow the backend cursor rather than the oldest shown timestamp, so
+    posts sharing a timestamp across a page boundary are not skipped. If a
+    refresh trimmed the window (it then holds the newest posts), the window is
+    first fetched again to get a cursor for its end.
+    """
+    feed = feed_store()
+    if not feed["posts"]:
+        return
+    try:
+        result = None
+        if feed["next_cursor"] is None:
+            window = fetch_posts(max_posts=len(feed["posts"]))
+            if window is not None:
+                feed["posts"], feed["next_cursor"] = window
+                if feed["next_cursor"] is None:
+                    feed["has_older"] = False
+                    return
+        if feed["next_cursor"] is not None:
+            result = fetch_posts(cursor=feed["next_cursor"])
+    except requests.RequestException:
+        result = None
+    if result is None:
+        st.toast("Could not load more posts, try again.")
+        return
+    older, feed["next_cursor"] = result
+    feed["has_older"] = feed["next_cursor"] is not None
+    feed["posts"].extend(older)
+    excess = len(feed["posts"]) - FEED_MAX_POSTS
+    if excess > 0:
+        del feed["posts"][:excess]
+        feed["at_top"] = False
+
+def back_to_newest():
+    """Discards the window so the next render starts again from the newest page."""
+    st.session_state.pop("feed", None)
 
 # Login/Register Page with Tabs
 def login_page():
@@ -313,12 +478,14 @@ def dashboard():
     st.markdown('<div class="title-box">TruePix</div>', unsafe_allow_html=True)
 
     user = st.session_state.user_data
+    # 90px avatar slot: prefer the 128px derivative over the full-size original
+    avatar_url = html.escape((user.get("profile_image_variants") or {}).get("128") or user["profile_image_url"], quote=True)
 
     with st.sidebar:
         st.markdown(
             f"""
             <div class="profile-container">
-                <img src="{user['profile_image_url']}" class="profile-pic">
+                <img src="{avatar_url}" class="profile-pic">
                 <span class="username">{user['username']} 👋</span>
             </div>
             """,
@@ -330,6 +497,8 @@ def dashboard():
             # Clear session state
             st.session_state.logged_in = False
             st.session_state.user_data = None
+            st.session_state.pop("feed", None)
+            st.session_state.pop("image_stats", None)
 
             # Redirect to Login Page
             st.rerun()
@@ -360,34 +529,57 @@ def dashboard():
             st.warning("Post content and image are required!")
 
     # Display Posts
+    feed_section()
+
+@st.fragment
+def feed_section():
+    """Renders the feed window; paging reruns only this fragment, not the whole dashboard."""
     st.subheader("All Posts 📢")
     posts = get_posts()
+    feed = feed_store()
+
+    if not feed["at_top"]:
+        st.button("⬆️ Back to newest posts", key="feed_newest", on_click=back_to_newest)
 
     if not posts:
         st.info("No posts available.")
-    else:
-        for idx, post in enumerate(posts):  # Loop with index for unique keys
-            col1, col2 = st.columns([1, 5])  # Layout for user profile image & post content
-
-            # Column 1: Profile Image (Rounded)
-            with col1:
-                st.markdown(f'<img src="{post["user_profile_image_url"]}" class="profile-pic">', unsafe_allow_html=True)
-            
-            # Column 2: Post Content
-            with col2:
-                st.write(f"**{post['username']}** posted:")
-                st.write(post["content"])
-                
-                # Show Post Image
-                st.image(post["post_image_url"], use_container_width=True)
-
-                # Display Post Status
-                if post["status"]:
-                    st.success(f"✔️ Real", icon="✅")
-                else:
-                    st.error(f"❌ Fake", icon="🚨")
-
-            st.divider()
+        return
+
+    for post in posts:
+        col1, col2 = st.columns([1, 5])  # Layout for user profile image & post content
+
+        # Column 1: Profile Image (Rounded)
+        with col1:
+            # URLs embed client-supplied filenames, so they are escaped before going into markup
+            avatar_url = html.escape(post["user_profile_image_url"], quote=True)
+            st.markdown(f'<img src="{avatar_url}" class="profile-pic" loading="lazy">', unsafe_allow_html=True)
+
+        # Column 2: Post Content
+        with col2:
+            st.write(f"**{post['username']}** posted:")
+            st.write(post["content"])
+
+            # Show Post Image (display-sized derivative; the browser loads it once scrolled near)
+            st.markdown(
+                f'<img src="{html.escape(post["post_image_url"], quote=True)}" loading="lazy" '
+                f'style="width: 100%; max-width: {FEED_IMAGE_WIDTH}px;">',
+                unsafe_allow_html=True,
+            )
+
+            # Display Post Status
+            if post["status"] == "pending":
+                st.info("Verification pending", icon="⏳")
+            elif post["status"] == "failed":
+                st.warning("Could not be verified", icon="⚠️")
+            elif post["status"]:
+                st.success(f"✔️ Real", icon="✅")
+            else:
+                st.error(f"❌ Fake", icon="🚨")
+
+        st.divider()
+
+    if feed["has_older"]:
+        st.button("Load more posts", key="feed_more", on_click=load_older)
 
 # Main Application
 if st.session_state.logged_in: